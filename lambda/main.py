@@ -2,7 +2,6 @@ import json
 import os
 import logging
 from datetime import datetime
-import boto3
 import sys
 
 # Add parent directory to path for imports
@@ -11,7 +10,17 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from utils.ec2_cleanup import EC2Cleanup
 from utils.rds_cleanup import RDSCleanup
 from utils.ebs_cleanup import EBSCleanup
-from utils.tagging_enforcer import TaggingEnforcer
+from utils.tagging_enforcer import BULK_TAG_WORKERS, TaggingEnforcer
+from utils.savings_rollup import SavingsRollup
+from utils.scan_archive import ScanArchive
+from utils.async_scanner import AIOBOTOCORE_AVAILABLE, AsyncScanEngine
+from utils.cur_ingest import COST_CATEGORIES, CURCostIndex, finding_resource_ids
+from utils.report_store import ReportStore
+from utils.metric_cache import MetricCache
+from utils.stop_time_index import StopTimeIndex
+from utils.profiler import NullProfiler, ScanProfiler
+from utils.client_registry import CLIENT_REGISTRY
+from utils.incremental_scan import FindingsState, IncrementalScanner, parse_resource_event
 
 # Configure logging
 log_level = os.environ.get('LOG_LEVEL', 'INFO')
@@ -21,23 +30,167 @@ logger.setLevel(getattr(logging, log_level))
 
 def lambda_handler(event, context):
     """Main Lambda handler for cost optimization"""
+    profiling = (
+        (isinstance(event, dict) and bool(event.get('profile')))
+        or os.environ.get('ENABLE_PROFILING', 'false').lower() == 'true'
+    )
+    if not profiling:
+        return run_scan(event, context)
+
+    profiler = ScanProfiler(top_n=int(os.environ.get('PROFILE_TOP_N', 25)))
+    profiler.start()
+    try:
+        result = run_scan(event, context, profiler)
+    finally:
+        profiler.stop()
+
+    # Offline replays return the hotspot summary inline instead of uploading it
+    body = json.loads(result['body'])
+    if 'report' in body:
+        body['profile'] = profiler.summary()
+        result['body'] = json.dumps(body)
+        return result
+
+    # Store profile artifacts next to the report, or under profiles/ for runs without one
+    report_bucket = os.environ.get('REPORT_BUCKET', 'aws-cost-optimizer-reports')
+    report_location = body.get('report_location', '')
+    if report_location.startswith(f"s3://{report_bucket}/"):
+        key_prefix = report_location[len(f"s3://{report_bucket}/"):].rsplit('.json', 1)[0]
+    else:
+        key_prefix = f"profiles/{datetime.now().strftime('%Y-%m-%d-%H-%M-%S')}"
+    try:
+        profiler.upload(report_bucket, key_prefix, client_factory=CLIENT_REGISTRY.client)
+    except Exception as e:
+        logger.error(f"Error uploading profile: {e}")
+
+    return result
+
+
+def run_scan(event, context, profiler=NullProfiler()):
+    """Run a full or incremental cost optimization scan"""
     logger.info("Starting AWS Cost Optimization scan...")
     
-    # Get configuration from environment
+    # Get configuration from environment, allowing per-invocation overrides from the event
+    event = event if isinstance(event, dict) else {}
+    overrides = event.get('configuration') or {}
     region = os.environ.get('AWS_REGION', 'us-east-1')
     report_bucket = os.environ.get('REPORT_BUCKET', 'aws-cost-optimizer-reports')
-    idle_ec2_days = int(os.environ.get('IDLE_EC2_DAYS', 7))
-    idle_rds_days = int(os.environ.get('IDLE_RDS_DAYS', 7))
+    idle_ec2_days = int(overrides.get('idle_ec2_days', os.environ.get('IDLE_EC2_DAYS', 7)))
+    idle_rds_days = int(overrides.get('idle_rds_days', os.environ.get('IDLE_RDS_DAYS', 7)))
+    snapshot_age_days = int(overrides.get('snapshot_age_days', os.environ.get('SNAPSHOT_AGE_DAYS', 90)))
+    zero_io_days = int(overrides.get('zero_io_days', os.environ.get('ZERO_IO_LOOKBACK_DAYS', 14)))
     auto_terminate = os.environ.get('AUTO_TERMINATE', 'false').lower() == 'true'
     cost_threshold = float(os.environ.get('COST_THRESHOLD', 50))
-    required_tags = os.environ.get('REQUIRED_TAGS', 'Owner,Project,Environment').split(',')
+    required_tags = overrides.get('required_tags') or os.environ.get('REQUIRED_TAGS', 'Owner,Project,Environment').split(',')
     slack_webhook = os.environ.get('SLACK_WEBHOOK_URL', '')
+    rollup_top_k = int(os.environ.get('ROLLUP_TOP_K', 5))
+    findings_state_key = os.environ.get('FINDINGS_STATE_KEY', 'state/current-findings.json')
+    scan_engine = os.environ.get('SCAN_ENGINE', 'sync').lower()
+    async_concurrency = int(os.environ.get('ASYNC_CONCURRENCY', 200))
+    # Every service needs at least one slot or its semaphore never opens
+    async_limits = {
+        'cloudwatch': max(1, async_concurrency),
+        'rds': max(1, async_concurrency // 4),
+        'ec2': max(1, async_concurrency // 4)
+    }
+    cur_locations = [location for location in os.environ.get('CUR_LOCATIONS', '').split(',') if location]
+    cur_cost_column = os.environ.get('CUR_COST_COLUMN', 'unblended')
+    tag_remediation = overrides.get('tag_remediation', os.environ.get('TAG_REMEDIATION', 'off')).lower()
+    metric_cache_location = os.environ.get('METRIC_CACHE_LOCATION', f"s3://{report_bucket}/state/metric-cache.json")
+    stop_time_index_location = os.environ.get(
+        'STOP_TIME_INDEX_LOCATION', f"s3://{report_bucket}/state/stop-time-index.json"
+    )
+    default_tags = dict(
+        pair.split('=', 1) for pair in os.environ.get('DEFAULT_TAGS', '').split(',') if '=' in pair
+    )
+    scan_mode = event.get('scan_mode', os.environ.get('SCAN_MODE', 'live')).lower()
+    scan_archive_location = event.get('scan_archive', os.environ.get('SCAN_ARCHIVE', ''))
+    
+    # Live scans reuse warm clients; record raw API responses, or replay them offline with no AWS access
+    client_factory = CLIENT_REGISTRY.client
+    # Size each service's pool to the widest fan-out that shares its clients
+    CLIENT_REGISTRY.bind(context, pool_sizes={
+        'cloudwatch': async_limits['cloudwatch'],
+        'ec2': max(BULK_TAG_WORKERS, async_limits['ec2']),
+        'rds': max(BULK_TAG_WORKERS, async_limits['rds'])
+    })
+    scan_archive = None
+    if scan_mode == 'record':
+        scan_archive = ScanArchive(metadata={'recorded_at': datetime.now().isoformat(), 'region': region})
+        client_factory = scan_archive.client_factory('record')
+        if not scan_archive_location:
+            scan_archive_location = (
+                f"s3://{report_bucket}/archives/scan-{datetime.now().strftime('%Y-%m-%d-%H-%M-%S')}.json.gz"
+            )
+    elif scan_mode == 'replay':
+        scan_archive = ScanArchive.load(scan_archive_location)
+        client_factory = scan_archive.client_factory('replay')
+        region = scan_archive.metadata.get('region', region)
+        auto_terminate = False
+        if tag_remediation == 'apply':
+            tag_remediation = 'plan'
+    
+    # Fail fast rather than return empty metric findings for windows the archive cannot serve
+    if scan_archive:
+        scan_archive.check_metric_window(max(idle_rds_days, zero_io_days))
+    
+    # Replays judge ages as of the recording so an archive gives the same findings whenever it is replayed
+    scan_time = None
+    if scan_mode == 'replay' and scan_archive.metadata.get('recorded_at'):
+        scan_time = datetime.fromisoformat(scan_archive.metadata['recorded_at'])
+    
+    # Cache daily metric aggregates between live runs; recordings and replays need full windows
+    metric_cache = None
+    if scan_mode == 'live' and metric_cache_location:
+        metric_cache = MetricCache(
+            metric_cache_location, max_days=max(idle_ec2_days, idle_rds_days), client_factory=client_factory
+        )
+    
+    # Recordings and replays sweep the full CloudTrail history instead of the persisted index;
+    # live sweeps get a slice of the invocation's remaining time and resume where they stopped
+    stop_time_index = StopTimeIndex(
+        stop_time_index_location if scan_mode == 'live' else None, region=region, client_factory=client_factory
+    )
+    if scan_mode == 'live':
+        stop_time_index.time_budget = int(os.environ.get('STOP_TIME_SWEEP_SECONDS', 60))
+        if context is not None:
+            stop_time_index.time_budget = min(
+                stop_time_index.time_budget, context.get_remaining_time_in_millis() / 1000 / 4
+            )
     
     # Initialize cleanup modules
-    ec2_cleanup = EC2Cleanup(region=region)
-    rds_cleanup = RDSCleanup(region=region)
-    ebs_cleanup = EBSCleanup(region=region)
-    tagging_enforcer = TaggingEnforcer(region=region, required_tags=required_tags)
+    ec2_cleanup = EC2Cleanup(
+        region=region, client_factory=client_factory, stop_time_index=stop_time_index, scan_time=scan_time
+    )
+    rds_cleanup = RDSCleanup(region=region, client_factory=client_factory, metric_cache=metric_cache)
+    ebs_cleanup = EBSCleanup(
+        region=region, client_factory=client_factory, scan_time=scan_time,
+        full_metric_coverage=(scan_mode == 'record')
+    )
+    tagging_enforcer = TaggingEnforcer(region=region, required_tags=required_tags, client_factory=client_factory)
+    savings_rollup = SavingsRollup(group_tags=required_tags, top_k=rollup_top_k)
+    
+    # State-change and tag-change events re-evaluate only the affected resources
+    targets = parse_resource_event(event)
+    if targets:
+        profiler.mark('incremental_scan')
+        logger.info(f"Incremental scan for {len(targets)} resources from {event.get('detail-type')}")
+        incremental_scanner = IncrementalScanner(
+            ec2_cleanup, rds_cleanup, ebs_cleanup, tagging_enforcer,
+            idle_ec2_days=idle_ec2_days, idle_rds_days=idle_rds_days
+        )
+        findings_state = FindingsState(report_bucket, findings_state_key, client_factory=client_factory)
+        updates = incremental_scanner.process(targets, findings_state)
+        if metric_cache:
+            metric_cache.save(prune=False)
+        return {
+            'statusCode': 200,
+            'body': json.dumps({
+                'message': 'Incremental scan completed',
+                'resources': [f"{resource_type}:{resource_id}" for resource_type, resource_id in targets],
+                'active_findings': sum(1 for _, _, finding in updates if finding is not None)
+            })
+        }
     
     # Collect cost optimization opportunities
     report = {
@@ -46,44 +199,109 @@ def lambda_handler(event, context):
         'configuration': {
             'idle_ec2_days': idle_ec2_days,
             'idle_rds_days': idle_rds_days,
+            'snapshot_age_days': snapshot_age_days,
+            'zero_io_days': zero_io_days,
             'auto_terminate': auto_terminate,
             'cost_threshold': cost_threshold,
-            'required_tags': required_tags
+            'required_tags': required_tags,
+            'cur_locations': cur_locations
         },
+        'scan_mode': scan_mode,
         'findings': {},
         'summary': {}
     }
     
-    # Scan for idle EC2 instances
-    logger.info("Scanning for idle EC2 instances...")
-    idle_ec2 = ec2_cleanup.get_idle_instances(idle_days=idle_ec2_days)
-    report['findings']['idle_ec2_instances'] = idle_ec2
-    
-    # Scan for idle RDS instances
-    logger.info("Scanning for idle RDS instances...")
-    idle_rds = rds_cleanup.get_idle_instances(idle_days=idle_rds_days)
-    report['findings']['idle_rds_instances'] = idle_rds
+    # The async engine talks to AWS directly, so record/replay always uses the sync scanners
+    async_engine = None
+    if scan_engine == 'async' and scan_mode == 'live':
+        if AIOBOTOCORE_AVAILABLE:
+            async_engine = AsyncScanEngine(
+                ec2_cleanup, rds_cleanup, ebs_cleanup, tagging_enforcer, region=region,
+                concurrency=async_limits
+            )
+        else:
+            logger.warning("SCAN_ENGINE=async but aiobotocore is not installed; using the synchronous scanners")
     
-    # Scan for unattached EBS volumes
-    logger.info("Scanning for unattached EBS volumes...")
-    unattached_volumes = ebs_cleanup.get_unattached_volumes()
-    report['findings']['unattached_ebs_volumes'] = unattached_volumes
+    if async_engine:
+        profiler.mark('async_scan')
+        logger.info("Scanning all resources with the async engine...")
+        # Load the cache up front so its S3 read does not block the event loop
+        if metric_cache:
+            metric_cache.load()
+        report['findings'] = async_engine.scan(
+            idle_ec2_days=idle_ec2_days, idle_rds_days=idle_rds_days,
+            snapshot_age_days=snapshot_age_days, zero_io_days=zero_io_days
+        )
+        idle_ec2 = report['findings']['idle_ec2_instances']
+        idle_rds = report['findings']['idle_rds_instances']
+        unattached_volumes = report['findings']['unattached_ebs_volumes']
+        zero_io_volumes = report['findings']['zero_io_ebs_volumes']
+        old_snapshots = report['findings']['old_snapshots']
+        non_compliant_resources = report['findings']['non_compliant_resources']
+    else:
+        profiler.mark('idle_ec2_scan')
+        # Scan for idle EC2 instances
+        logger.info("Scanning for idle EC2 instances...")
+        idle_ec2 = ec2_cleanup.get_idle_instances(idle_days=idle_ec2_days)
+        report['findings']['idle_ec2_instances'] = idle_ec2
+        
+        profiler.mark('idle_rds_scan')
+        # Scan for idle RDS instances
+        logger.info("Scanning for idle RDS instances...")
+        idle_rds = rds_cleanup.get_idle_instances(idle_days=idle_rds_days)
+        report['findings']['idle_rds_instances'] = idle_rds
+        
+        profiler.mark('unattached_ebs_scan')
+        # Scan for unattached EBS volumes
+        logger.info("Scanning for unattached EBS volumes...")
+        unattached_volumes = ebs_cleanup.get_unattached_volumes()
+        report['findings']['unattached_ebs_volumes'] = unattached_volumes
+        
+        profiler.mark('zero_io_ebs_scan')
+        # Scan for attached EBS volumes with no I/O
+        logger.info("Scanning for zero-I/O attached EBS volumes...")
+        zero_io_volumes = ebs_cleanup.get_zero_io_volumes(days=zero_io_days)
+        report['findings']['zero_io_ebs_volumes'] = zero_io_volumes
+        
+        profiler.mark('old_snapshots_scan')
+        # Scan for old snapshots
+        logger.info("Scanning for old EBS snapshots...")
+        old_snapshots = ebs_cleanup.get_old_snapshots(days=snapshot_age_days)
+        report['findings']['old_snapshots'] = old_snapshots
+        
+        profiler.mark('tag_compliance_scan')
+        # Check tag compliance
+        logger.info("Checking tag compliance...")
+        non_compliant_resources = tagging_enforcer.get_all_non_compliant_resources()
+        report['findings']['non_compliant_resources'] = non_compliant_resources
     
-    # Scan for old snapshots
-    logger.info("Scanning for old EBS snapshots...")
-    old_snapshots = ebs_cleanup.get_old_snapshots(days=90)
-    report['findings']['old_snapshots'] = old_snapshots
+    profiler.mark('metric_cache_save')
+    # Evict cached metrics for resources that disappeared or fell outside the window
+    if metric_cache:
+        metric_cache.save(prune=True)
+    stop_time_index.save(prune=True)
     
-    # Check tag compliance
-    logger.info("Checking tag compliance...")
-    non_compliant_resources = tagging_enforcer.get_all_non_compliant_resources()
-    report['findings']['non_compliant_resources'] = non_compliant_resources
+    profiler.mark('cur_join')
+    # Replace static price estimates with actual spend from the Cost and Usage Report
+    if cur_locations:
+        logger.info("Joining findings against Cost and Usage Report data...")
+        resource_ids = [
+            resource_id
+            for category in COST_CATEGORIES
+            for item in report['findings'].get(category, [])
+            for resource_id in finding_resource_ids(category, item)
+        ]
+        cur_index = CURCostIndex(cost_column=cur_cost_column, client_factory=CLIENT_REGISTRY.client)
+        cur_index.ingest(cur_locations, resource_ids=resource_ids)
+        cur_index.apply_to_findings(report['findings'])
     
+    profiler.mark('summary')
     # Calculate total potential savings
     total_savings = 0
     total_savings += sum(item['estimated_monthly_savings'] for item in idle_ec2)
     total_savings += sum(item['estimated_monthly_savings'] for item in idle_rds)
     total_savings += sum(item['estimated_monthly_savings'] for item in unattached_volumes)
+    total_savings += sum(item['estimated_monthly_savings'] for item in zero_io_volumes)
     total_savings += sum(item['estimated_monthly_savings'] for item in old_snapshots)
     
     # Generate summary
@@ -92,13 +310,24 @@ def lambda_handler(event, context):
         'idle_ec2_count': len(idle_ec2),
         'idle_rds_count': len(idle_rds),
         'unattached_volumes_count': len(unattached_volumes),
+        'zero_io_volumes_count': len(zero_io_volumes),
         'old_snapshots_count': len(old_snapshots),
         'non_compliant_resources_count': len(non_compliant_resources),
         'actions_taken': []
     }
     
+    # Roll up savings by owner, project, environment and region
+    logger.info("Building savings roll-up...")
+    report['summary']['savings_rollup'] = savings_rollup.build(report['findings'], region)
+    
+    profiler.mark('remediation')
     # Perform cleanup actions if auto_terminate is enabled
-    if auto_terminate:
+    if auto_terminate and async_engine:
+        logger.info("Auto-terminate is enabled. Performing cleanup actions with the async engine...")
+        report['summary']['actions_taken'].extend(
+            async_engine.remediate(idle_ec2, idle_rds, unattached_volumes, old_snapshots)
+        )
+    elif auto_terminate:
         logger.info("Auto-terminate is enabled. Performing cleanup actions...")
         
         # Terminate idle EC2 instances
@@ -131,10 +360,52 @@ def lambda_handler(event, context):
     else:
         report['summary']['actions_taken'].append("Report-only mode: No resources terminated")
     
+    profiler.mark('tag_remediation')
+    # Backfill missing tags in bulk, grouped by the exact tag set each resource needs
+    if tag_remediation in ('plan', 'apply') and default_tags:
+        logger.info(f"Bulk tag remediation ({tag_remediation})...")
+        tag_plan = tagging_enforcer.plan_bulk_tagging(non_compliant_resources, default_tags)
+        tag_summary = tagging_enforcer.apply_bulk_tags(tag_plan, dry_run=(tag_remediation == 'plan'))
+        report['tag_remediation'] = {'plan': tag_plan, 'summary': tag_summary}
+        if tag_remediation == 'apply':
+            report['summary']['actions_taken'].append(
+                f"Tagged {tag_summary['resources_tagged']} resources with {tag_summary['api_calls']} API calls"
+            )
+    
+    profiler.mark('findings_state')
+    # Full scans reconcile the current-findings state used by incremental events
+    if scan_mode != 'replay':
+        try:
+            findings_state = FindingsState(report_bucket, findings_state_key, client_factory=CLIENT_REGISTRY.client)
+            findings_state.replace_all(report['findings'])
+            findings_state.save(conditional=False)
+            logger.info(f"Reconciled findings state at s3://{report_bucket}/{findings_state_key}")
+        except Exception as e:
+            logger.error(f"Error saving findings state: {e}")
+    
+    # Replayed scans are offline evaluations: return the report instead of publishing it
+    if scan_mode == 'replay':
+        logger.info(f"Replay scan complete. Total potential savings: ${total_savings:.2f}/month")
+        return {
+            'statusCode': 200,
+            'body': json.dumps({
+                'message': 'Cost optimization replay completed',
+                'total_savings': total_savings,
+                'report': report
+            })
+        }
+    
+    if scan_mode == 'record':
+        try:
+            scan_archive.save(scan_archive_location)
+        except Exception as e:
+            logger.error(f"Error saving scan archive: {e}")
+    
+    profiler.mark('report_upload')
     # Save report to S3
-    report_key = f"reports/cost-optimization-{datetime.now().strftime('%Y-%m-%d-%H-%M-%S')}.json"
-    save_report_to_s3(report, report_bucket, report_key)
+    report_key = save_report_to_s3(report, report_bucket)
     
+    profiler.mark('slack_notification')
     # Send Slack notification if webhook configured
     if slack_webhook and total_savings >= cost_threshold:
         send_slack_notification(report, slack_webhook, report_bucket, report_key)
@@ -146,24 +417,22 @@ def lambda_handler(event, context):
         'body': json.dumps({
             'message': 'Cost optimization scan completed',
             'total_savings': total_savings,
-            'report_location': f"s3://{report_bucket}/{report_key}"
+            'report_location': f"s3://{report_bucket}/{report_key}",
+            'manifest_location': f"s3://{report_bucket}/reports/manifest/latest.json"
         })
     }
 
 
-def save_report_to_s3(report, bucket, key):
-    """Save cost optimization report to S3"""
+def save_report_to_s3(report, bucket):
+    """Save cost optimization report to S3 under a date-partitioned key and update the manifest"""
+    report_store = ReportStore(bucket, client_factory=CLIENT_REGISTRY.client)
+    # One timestamp so the returned key is the one written, even when the write fails
+    run_time = datetime.now()
     try:
-        s3_client = boto3.client('s3')
-        s3_client.put_object(
-            Bucket=bucket,
-            Key=key,
-            Body=json.dumps(report, indent=2),
-            ContentType='application/json'
-        )
-        logger.info(f"Report saved to s3://{bucket}/{key}")
+        return report_store.save(report, run_time)
     except Exception as e:
         logger.error(f"Error saving report to S3: {e}")
+        return report_store.report_key(run_time)
 
 
 def send_slack_notification(report, webhook_url, bucket, report_key):
@@ -174,7 +443,8 @@ def send_slack_notification(report, webhook_url, bucket, report_key):
         
         def send_cost_alert(webhook_url, total_savings, idle_ec2_count, idle_rds_count, 
                            unattached_volumes_count, old_snapshots_count, non_compliant_count,
-                           actions_taken, report_url):
+                           actions_taken, report_url, savings_rollup=None, zero_io_volumes_count=0,
+                           snapshot_age_days=90):
             """Send formatted cost optimization alert to Slack"""
             
             # Determine urgency emoji based on savings amount
@@ -196,6 +466,19 @@ def send_slack_notification(report, webhook_url, bucket, report_key):
             if len(actions_taken) > 5:
                 actions_summary += f"\n  • ... and {len(actions_taken) - 5} more actions"
             
+            # Build top savings groups per dimension
+            rollup_fields = []
+            for dimension, rows in (savings_rollup or {}).items():
+                top_groups = "\n".join(
+                    f"{row['group']}: ${row['estimated_monthly_savings']:.2f} ({row['resource_count']})"
+                    for row in rows[:3]
+                )
+                if top_groups:
+                    rollup_fields.append({
+                        "type": "mrkdwn",
+                        "text": f"*Top by {dimension}:*\n{top_groups}"
+                    })
+            
             slack_username = os.environ.get('SLACK_USERNAME', 'AWS Cost Optimizer Bot')
             
             # Create Slack message
@@ -251,7 +534,11 @@ def send_slack_notification(report, webhook_url, bucket, report_key):
                             },
                             {
                                 "type": "mrkdwn",
-                                "text": f"📸 *Old Snapshots (>90 days):*\n{old_snapshots_count}"
+                                "text": f"💤 *Zero-I/O EBS Volumes:*\n{zero_io_volumes_count}"
+                            },
+                            {
+                                "type": "mrkdwn",
+                                "text": f"📸 *Old Snapshots (>{snapshot_age_days} days):*\n{old_snapshots_count}"
                             },
                             {
                                 "type": "mrkdwn",
@@ -288,6 +575,17 @@ def send_slack_notification(report, webhook_url, bucket, report_key):
                 ]
             }
             
+            if rollup_fields:
+                message["blocks"][5:5] = [
+                    {
+                        "type": "divider"
+                    },
+                    {
+                        "type": "section",
+                        "fields": rollup_fields[:10]
+                    }
+                ]
+            
             # Send to Slack
             response = requests.post(
                 webhook_url,
@@ -305,10 +603,13 @@ def send_slack_notification(report, webhook_url, bucket, report_key):
             idle_ec2_count=summary['idle_ec2_count'],
             idle_rds_count=summary['idle_rds_count'],
             unattached_volumes_count=summary['unattached_volumes_count'],
+            zero_io_volumes_count=summary.get('zero_io_volumes_count', 0),
             old_snapshots_count=summary['old_snapshots_count'],
+            snapshot_age_days=report['configuration']['snapshot_age_days'],
             non_compliant_count=summary['non_compliant_resources_count'],
             actions_taken=summary['actions_taken'],
-            report_url=f"https://s3.console.aws.amazon.com/s3/object/{bucket}?prefix={report_key}"
+            savings_rollup=summary.get('savings_rollup'),
+            report_url=f"https://s3.console.aws.amazon.com/s3/object/{bucket}?region={report['region']}&prefix={report_key}"
         )
         logger.info("Slack notification sent successfully")
     except Exception as e:
@@ -334,12 +635,21 @@ def send_slack_notification(report, webhook_url, bucket, report_key):
         "instance_type": "t3.medium",
         "stopped_date": "2025-10-25T08:15:00",
         "days_stopped": 13,
-        "estimated_monthly_savings": 29.95,
-        "tags": {"Name": "test-instance"}
+        "tags": {"Name": "test-instance"},
+        "attached_volumes": [
+          {"volume_id": "vol-0abc", "size_gb": 30, "volume_type": "gp3", "delete_on_termination": true, "monthly_cost": 2.4}
+        ],
+        "elastic_ips": [{"public_ip": "203.0.113.10", "allocation_id": "eipalloc-0abc"}],
+        "storage_monthly_savings": 2.4,
+        "retained_storage_monthly_cost": 0.0,
+        "retained_elastic_ip_monthly_cost": 3.65,
+        "running_compute_monthly_cost": 29.95,
+        "estimated_monthly_savings": 2.4
       }
     ],
     "idle_rds_instances": [],
     "unattached_ebs_volumes": [],
+    "zero_io_ebs_volumes": [],
     "old_snapshots": [],
     "non_compliant_resources": []
   },
@@ -348,9 +658,25 @@ def send_slack_notification(report, webhook_url, bucket, report_key):
     "idle_ec2_count": 5,
     "idle_rds_count": 2,
     "unattached_volumes_count": 8,
+    "zero_io_volumes_count": 3,
     "old_snapshots_count": 12,
     "non_compliant_resources_count": 15,
-    "actions_taken": ["Report-only mode: No resources terminated"]
+    "actions_taken": ["Report-only mode: No resources terminated"],
+    "savings_rollup": {
+      "Owner": [
+        {
+          "group": "payments",
+          "estimated_monthly_savings": 210.40,
+          "resource_count": 6,
+          "top_resources": [
+            {"resource_id": "db-payments-staging", "category": "idle_rds_instances", "estimated_monthly_savings": 138.24}
+          ]
+        }
+      ],
+      "Project": [],
+      "Environment": [],
+      "Region": []
+    }
   }
 }
 """
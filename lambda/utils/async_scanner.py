@@ -0,0 +1,294 @@
+import asyncio
+import logging
+from contextlib import AsyncExitStack
+
+from utils.rds_cleanup import IDLE_CONNECTION_THRESHOLD
+
+try:
+    from aiobotocore.config import AioConfig
+    from aiobotocore.session import get_session
+    AIOBOTOCORE_AVAILABLE = True
+except ImportError:
+    AIOBOTOCORE_AVAILABLE = False
+
+logger = logging.getLogger()
+
+
+# Default in-flight request limits per service
+DEFAULT_CONCURRENCY = {
+    'ec2': 50,
+    'rds': 50,
+    'cloudwatch': 200
+}
+
+
+class AsyncScanEngine:
+    """asyncio scanning backend that returns the same findings as the synchronous scanners"""
+
+    def __init__(self, ec2_cleanup, rds_cleanup, ebs_cleanup, tagging_enforcer,
+                 region='us-east-1', concurrency=None):
+        if not AIOBOTOCORE_AVAILABLE:
+            raise ImportError("aiobotocore is required for the async scan engine")
+
+        self.ec2_cleanup = ec2_cleanup
+        self.rds_cleanup = rds_cleanup
+        self.ebs_cleanup = ebs_cleanup
+        self.tagging_enforcer = tagging_enforcer
+        self.region = region
+        self.concurrency = {
+            service: max(1, limit) for service, limit in dict(DEFAULT_CONCURRENCY, **(concurrency or {})).items()
+        }
+        self.clients = {}
+        self.semaphores = {}
+
+    def scan(self, idle_ec2_days=7, idle_rds_days=7, snapshot_age_days=90, zero_io_days=14):
+        """Run every scanner phase concurrently and return findings keyed by report category"""
+        return asyncio.run(self._scan(idle_ec2_days, idle_rds_days, snapshot_age_days, zero_io_days))
+
+    def remediate(self, idle_ec2, idle_rds, unattached_volumes, old_snapshots):
+        """Run cleanup actions concurrently and return the action log in finding order"""
+        return asyncio.run(self._remediate(idle_ec2, idle_rds, unattached_volumes, old_snapshots))
+
+    async def _open_clients(self, stack):
+        """Open one pooled client per service, sized to its concurrency limit"""
+        session = get_session()
+        for service, limit in self.concurrency.items():
+            config = AioConfig(max_pool_connections=limit)
+            self.clients[service] = await stack.enter_async_context(
+                session.create_client(service, region_name=self.region, config=config)
+            )
+            self.semaphores[service] = asyncio.Semaphore(limit)
+
+    async def _call(self, service, operation, **kwargs):
+        """Invoke one API operation within the service's concurrency limit"""
+        async with self.semaphores[service]:
+            return await getattr(self.clients[service], operation)(**kwargs)
+
+    async def _scan(self, idle_ec2_days, idle_rds_days, snapshot_age_days, zero_io_days):
+        async with AsyncExitStack() as stack:
+            await self._open_clients(stack)
+            (idle_ec2, idle_rds, unattached_volumes, zero_io_volumes, old_snapshots,
+             ec2_tags, ebs_tags, rds_tags) = await asyncio.gather(
+                self._idle_ec2(idle_ec2_days),
+                self._idle_rds(idle_rds_days),
+                self._unattached_volumes(),
+                # Already a few dozen batched calls; run the synchronous detector off the loop
+                asyncio.to_thread(self.ebs_cleanup.get_zero_io_volumes, zero_io_days),
+                self._old_snapshots(snapshot_age_days),
+                self._ec2_tags(),
+                self._ebs_tags(),
+                self._rds_tags()
+            )
+
+        return {
+            'idle_ec2_instances': idle_ec2,
+            'idle_rds_instances': idle_rds,
+            'unattached_ebs_volumes': unattached_volumes,
+            'zero_io_ebs_volumes': zero_io_volumes,
+            'old_snapshots': old_snapshots,
+            'non_compliant_resources': ec2_tags + ebs_tags + rds_tags
+        }
+
+    async def _idle_ec2(self, idle_days):
+        try:
+            response, _ = await asyncio.gather(
+                self._call(
+                    'ec2', 'describe_instances',
+                    Filters=[{'Name': 'instance-state-name', 'Values': ['stopped']}]
+                ),
+                asyncio.to_thread(self.ec2_cleanup.refresh_stop_times)
+            )
+            instances = [
+                instance for reservation in response['Reservations'] for instance in reservation['Instances']
+            ]
+
+            idle_instances = []
+            if instances:
+                attachment_index = await self._attachment_index()
+                for instance in instances:
+                    finding = self.ec2_cleanup.evaluate_instance(instance, idle_days, attachment_index)
+                    if finding:
+                        idle_instances.append(finding)
+
+            logger.info(f"Found {len(idle_instances)} idle EC2 instances")
+            return idle_instances
+
+        except Exception as e:
+            logger.error(f"Error detecting idle EC2 instances: {e}")
+            return []
+
+    async def _attachment_index(self):
+        """Fetch volume and address inventories once and index them by instance"""
+        volumes = []
+        paginator = self.clients['ec2'].get_paginator('describe_volumes')
+        async for page in paginator.paginate(Filters=[{'Name': 'attachment.status', 'Values': ['attached']}]):
+            volumes.extend(page['Volumes'])
+        addresses = await self._call('ec2', 'describe_addresses')
+        return self.ec2_cleanup.index_attachments(volumes, addresses['Addresses'])
+
+    async def _average_connections(self, db_id, days):
+        try:
+            query = self.rds_cleanup.connection_metric_query(db_id, days)
+            response = await self._call('cloudwatch', 'get_metric_statistics', **query)
+            return self.rds_cleanup.average_connections_from(query, response['Datapoints'], days)
+        except Exception as e:
+            logger.warning(f"Could not get CloudWatch metrics for {db_id}: {e}")
+            return 0.0
+
+    async def _idle_rds(self, idle_days):
+        try:
+            response = await self._call('rds', 'describe_db_instances')
+            candidates = [
+                db_instance for db_instance in response['DBInstances']
+                if db_instance['DBInstanceStatus'] == 'available'
+            ]
+
+            averages = await asyncio.gather(*(
+                self._average_connections(db_instance['DBInstanceIdentifier'], idle_days)
+                for db_instance in candidates
+            ))
+            idle = [
+                (db_instance, avg_connections)
+                for db_instance, avg_connections in zip(candidates, averages)
+                if avg_connections < IDLE_CONNECTION_THRESHOLD
+            ]
+
+            tag_responses = await asyncio.gather(*(
+                self._call('rds', 'list_tags_for_resource', ResourceName=db_instance['DBInstanceArn'])
+                for db_instance, _ in idle
+            ))
+            idle_instances = [
+                self.rds_cleanup.build_idle_finding(db_instance, avg_connections, tags_response.get('TagList', []))
+                for (db_instance, avg_connections), tags_response in zip(idle, tag_responses)
+            ]
+
+            logger.info(f"Found {len(idle_instances)} idle RDS instances")
+            return idle_instances
+
+        except Exception as e:
+            logger.error(f"Error detecting idle RDS instances: {e}")
+            return []
+
+    async def _unattached_volumes(self):
+        try:
+            response = await self._call(
+                'ec2', 'describe_volumes',
+                Filters=[{'Name': 'status', 'Values': ['available']}]
+            )
+            unattached_volumes = [
+                finding for finding in map(self.ebs_cleanup.evaluate_volume, response['Volumes']) if finding
+            ]
+
+            logger.info(f"Found {len(unattached_volumes)} unattached EBS volumes")
+            return unattached_volumes
+
+        except Exception as e:
+            logger.error(f"Error detecting unattached EBS volumes: {e}")
+            return []
+
+    async def _old_snapshots(self, days):
+        try:
+            response = await self._call('ec2', 'describe_snapshots', OwnerIds=['self'])
+            old_snapshots = [
+                finding for finding in (
+                    self.ebs_cleanup.evaluate_snapshot(snapshot, days) for snapshot in response['Snapshots']
+                ) if finding
+            ]
+
+            logger.info(f"Found {len(old_snapshots)} old snapshots (>{days} days)")
+            return old_snapshots
+
+        except Exception as e:
+            logger.error(f"Error detecting old snapshots: {e}")
+            return []
+
+    async def _ec2_tags(self):
+        try:
+            response = await self._call('ec2', 'describe_instances')
+            non_compliant = []
+            for reservation in response['Reservations']:
+                for instance in reservation['Instances']:
+                    finding = self.tagging_enforcer.evaluate_ec2_instance(instance)
+                    if finding:
+                        non_compliant.append(finding)
+
+            logger.info(f"Found {len(non_compliant)} non-compliant EC2 instances")
+            return non_compliant
+
+        except Exception as e:
+            logger.error(f"Error checking EC2 tags: {e}")
+            return []
+
+    async def _ebs_tags(self):
+        try:
+            response = await self._call('ec2', 'describe_volumes')
+            non_compliant = [
+                finding for finding in map(self.tagging_enforcer.evaluate_ebs_volume, response['Volumes']) if finding
+            ]
+
+            logger.info(f"Found {len(non_compliant)} non-compliant EBS volumes")
+            return non_compliant
+
+        except Exception as e:
+            logger.error(f"Error checking EBS tags: {e}")
+            return []
+
+    async def _rds_tags(self):
+        try:
+            response = await self._call('rds', 'describe_db_instances')
+            db_instances = response['DBInstances']
+            tag_responses = await asyncio.gather(*(
+                self._call('rds', 'list_tags_for_resource', ResourceName=db_instance['DBInstanceArn'])
+                for db_instance in db_instances
+            ))
+            non_compliant = [
+                finding for finding in (
+                    self.tagging_enforcer.evaluate_rds_instance(db_instance, tags_response.get('TagList', []))
+                    for db_instance, tags_response in zip(db_instances, tag_responses)
+                ) if finding
+            ]
+
+            logger.info(f"Found {len(non_compliant)} non-compliant RDS instances")
+            return non_compliant
+
+        except Exception as e:
+            logger.error(f"Error checking RDS tags: {e}")
+            return []
+
+    async def _action(self, service, operation, message, error_message, **kwargs):
+        """Run one cleanup call, returning the action log entry or None on failure"""
+        try:
+            await self._call(service, operation, **kwargs)
+            logger.info(message)
+            return message
+        except Exception as e:
+            logger.error(f"{error_message}: {e}")
+            return None
+
+    async def _remediate(self, idle_ec2, idle_rds, unattached_volumes, old_snapshots):
+        async with AsyncExitStack() as stack:
+            await self._open_clients(stack)
+            results = await asyncio.gather(
+                *(self._action('ec2', 'terminate_instances',
+                               f"Terminated EC2 instance: {item['instance_id']}",
+                               f"Error terminating instance {item['instance_id']}",
+                               InstanceIds=[item['instance_id']])
+                  for item in idle_ec2),
+                *(self._action('rds', 'stop_db_instance',
+                               f"Stopped RDS instance: {item['db_instance_id']}",
+                               f"Error stopping RDS instance {item['db_instance_id']}",
+                               DBInstanceIdentifier=item['db_instance_id'])
+                  for item in idle_rds),
+                *(self._action('ec2', 'delete_volume',
+                               f"Deleted EBS volume: {item['volume_id']}",
+                               f"Error deleting volume {item['volume_id']}",
+                               VolumeId=item['volume_id'])
+                  for item in unattached_volumes),
+                *(self._action('ec2', 'delete_snapshot',
+                               f"Deleted snapshot: {item['snapshot_id']}",
+                               f"Error deleting snapshot {item['snapshot_id']}",
+                               SnapshotId=item['snapshot_id'])
+                  for item in old_snapshots)
+            )
+
+        return [action for action in results if action]
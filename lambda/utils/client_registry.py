@@ -0,0 +1,96 @@
+import boto3
+import logging
+import os
+import threading
+import time
+from botocore.config import Config
+
+logger = logging.getLogger()
+
+
+# botocore's default connection pool size, used for services without a tuned size
+DEFAULT_POOL_SIZE = 10
+
+
+class ClientRegistry:
+    """boto3 clients cached by (account, region, service) across warm Lambda invocations"""
+
+    def __init__(self, ttl_seconds=3600, pool_sizes=None):
+        self.ttl_seconds = ttl_seconds
+        self.pool_sizes = dict(pool_sizes or {})
+        self.account = None
+        self.sessions = {}
+        self.clients = {}
+        self.lock = threading.Lock()
+
+    def bind(self, context=None, pool_sizes=None):
+        """Prepare for an invocation: resolve the account, resize pools and drop expired clients"""
+        arn = getattr(context, 'invoked_function_arn', None)
+        if arn:
+            # arn:aws:lambda:<region>:<account>:function:<name>
+            self.account = arn.split(':')[4]
+        if pool_sizes:
+            self.pool_sizes.update(pool_sizes)
+        evicted = self.evict_expired()
+        if evicted:
+            logger.info(f"Evicted {evicted} expired clients")
+
+    def client(self, service_name, region_name=None, **kwargs):
+        """Return a cached client, building it on first use, TTL expiry or credential change"""
+        region_name = region_name or os.environ.get('AWS_REGION', 'us-east-1')
+        pool_size = self.pool_sizes.get(service_name, DEFAULT_POOL_SIZE)
+        now = time.monotonic()
+
+        with self.lock:
+            account = self._resolve_account()
+            session = self._session(account)
+            fingerprint = self._credential_fingerprint(session)
+            key = (account, region_name, service_name, pool_size, tuple(sorted(kwargs.items())))
+            entry = self.clients.get(key)
+
+            if entry and now - entry['created'] < self.ttl_seconds and entry['fingerprint'] == fingerprint:
+                return entry['client']
+
+            config = Config(max_pool_connections=pool_size, retries={'mode': 'adaptive', 'max_attempts': 5})
+            client = session.client(service_name, region_name=region_name, config=config, **kwargs)
+            self.clients[key] = {'client': client, 'created': now, 'fingerprint': fingerprint}
+            logger.debug(f"Created {service_name} client for {account}/{region_name} ({'rebuilt' if entry else 'new'})")
+            return client
+
+    def _resolve_account(self):
+        """Account of the invoking function, or of the credentials outside Lambda (one STS call)"""
+        if self.account is None:
+            try:
+                self.account = boto3.Session().client('sts').get_caller_identity()['Account']
+            except Exception as e:
+                logger.warning(f"Could not resolve account, caching clients without one: {e}")
+                self.account = 'unknown'
+        return self.account
+
+    def _session(self, account):
+        """One boto3 session per account; credentials are resolved lazily by botocore"""
+        session = self.sessions.get(account)
+        if session is None:
+            session = self.sessions[account] = boto3.Session()
+        return session
+
+    def _credential_fingerprint(self, session):
+        """Identify the active credentials so rotated or refreshed keys invalidate cached clients"""
+        credentials = session.get_credentials()
+        if credentials is None:
+            return None
+        frozen = credentials.get_frozen_credentials()
+        return (frozen.access_key, hash(frozen.token))
+
+    def evict_expired(self):
+        """Drop clients older than the TTL so their connection pools can be released"""
+        now = time.monotonic()
+        with self.lock:
+            expired = [key for key, entry in self.clients.items() if now - entry['created'] >= self.ttl_seconds]
+            for key in expired:
+                del self.clients[key]
+        return len(expired)
+
+
+# Module scope so clients and their connection pools survive warm invocations
+CLIENT_REGISTRY = ClientRegistry(ttl_seconds=int(os.environ.get('CLIENT_TTL_SECONDS', 3600)))
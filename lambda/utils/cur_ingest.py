@@ -0,0 +1,268 @@
+import boto3
+import csv
+import gzip
+import io
+import json
+import logging
+from contextlib import closing
+from datetime import datetime, timedelta
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.fs as pafs
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger()
+
+
+# CUR column names: legacy CSV headers and the snake_case names used in Parquet exports
+RESOURCE_COLUMNS = ('lineItem/ResourceId', 'line_item_resource_id')
+USAGE_START_COLUMNS = ('lineItem/UsageStartDate', 'line_item_usage_start_date')
+COST_COLUMNS = {
+    'unblended': ('lineItem/UnblendedCost', 'line_item_unblended_cost'),
+    'net_unblended': ('lineItem/NetUnblendedCost', 'line_item_net_unblended_cost'),
+    'public_on_demand': ('pricing/publicOnDemandCost', 'pricing_public_on_demand_cost')
+}
+
+# Finding categories joined against the index, mapped to their ID field
+COST_CATEGORIES = {
+    'idle_ec2_instances': 'instance_id',
+    'idle_rds_instances': 'db_instance_id',
+    'unattached_ebs_volumes': 'volume_id',
+    'zero_io_ebs_volumes': 'volume_id',
+    'old_snapshots': 'snapshot_id'
+}
+
+PARQUET_BATCH_ROWS = 65536
+
+
+def normalize_resource_id(resource_id):
+    """Reduce CUR resource IDs and ARNs to the IDs used in findings"""
+    if not resource_id.startswith('arn:'):
+        return resource_id
+    if ':db:' in resource_id:
+        return resource_id.split(':db:', 1)[1]
+    return resource_id.rsplit('/', 1)[-1]
+
+
+def finding_resource_ids(category, item):
+    """Resource IDs whose spend is freed by acting on a finding"""
+    # Stopped instances accrue no compute; their trailing instance spend predates the stop,
+    # so only the volumes deleted with them count
+    if category == 'idle_ec2_instances':
+        return [
+            volume['volume_id'] for volume in item.get('attached_volumes', []) if volume['delete_on_termination']
+        ]
+    return [item[COST_CATEGORIES[category]]]
+
+
+def _pick_column(names, candidates):
+    """Return the first candidate column present in the file"""
+    for candidate in candidates:
+        if candidate in names:
+            return candidate
+    raise ValueError(f"CUR file has none of the columns {candidates}")
+
+
+def _period_bounds(manifest):
+    """Billing period of a manifest as ISO dates (end exclusive), or None where not stated"""
+    period = manifest.get('billingPeriod') or {}
+    # CUR 2.0 exports name the period as 'YYYY-MM'
+    if isinstance(period, str):
+        period = {'start': f"{period}-01"}
+    bounds = []
+    for field in ('start', 'end'):
+        digits = ''.join(ch for ch in str(period.get(field, '')) if ch.isdigit())
+        bounds.append(f"{digits[:4]}-{digits[4:6]}-{digits[6:8]}" if len(digits) >= 8 else None)
+    start, end = bounds
+    if start and not end:
+        year, month = int(start[:4]), int(start[5:7])
+        end = f"{year + month // 12:04d}-{month % 12 + 1:02d}-01"
+    return start, end
+
+
+class CURCostIndex:
+    """Per-resource actual costs streamed from Cost and Usage Report files"""
+
+    def __init__(self, as_of=None, cost_column='unblended', client_factory=None):
+        self.as_of = as_of or datetime.now()
+        self.cost_candidates = COST_COLUMNS[cost_column]
+        self.client_factory = client_factory or boto3.client
+        self.month_start = self.as_of.strftime('%Y-%m-01')
+        self.trailing_start = (self.as_of - timedelta(days=30)).strftime('%Y-%m-%d')
+        self.earliest = min(self.month_start, self.trailing_start)
+        self.costs = {}
+        self.rows_processed = 0
+
+    def ingest(self, locations, resource_ids=None):
+        """Stream CUR files from local paths, s3://bucket/key objects or s3://bucket/prefix/ into the index"""
+        # Restricting to known resources bounds memory by the findings, not the account
+        wanted = set(resource_ids) if resource_ids is not None else None
+
+        for location in self._expand(locations):
+            try:
+                if location.endswith('.parquet'):
+                    self._ingest_parquet(location, wanted)
+                else:
+                    self._ingest_csv(location, wanted)
+                logger.info(f"Ingested CUR file {location}")
+            except Exception as e:
+                logger.error(f"Error ingesting CUR file {location}: {e}")
+
+        logger.info(f"Indexed costs for {len(self.costs)} resources from {self.rows_processed} CUR rows")
+        return self
+
+    def _expand(self, locations):
+        """Expand S3 prefixes into the current CUR data files beneath them"""
+        for location in locations:
+            if not (location.startswith('s3://') and location.endswith('/')):
+                yield location
+                continue
+
+            bucket, prefix = location[5:].split('/', 1)
+            manifests, data_files = [], []
+            paginator = self.client_factory('s3').get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+                for obj in page.get('Contents', []):
+                    if obj['Key'].endswith('-Manifest.json'):
+                        manifests.append(obj['Key'])
+                    elif obj['Key'].endswith(('.csv.gz', '.parquet')):
+                        data_files.append(obj['Key'])
+
+            if manifests:
+                yield from self._manifest_files(bucket, manifests)
+            else:
+                logger.warning(f"No CUR manifest under {location}; ingesting every data file")
+                for key in data_files:
+                    yield f"s3://{bucket}/{key}"
+
+    def _manifest_files(self, bucket, manifests):
+        """Data files listed by the current manifest of each billing period"""
+        # Legacy CUR keeps superseded versions in assemblyId/ folders, each with its own manifest copy;
+        # the billing-period manifest one level up names the current version, so shallowest wins
+        seen = set()
+        for key in sorted(manifests, key=lambda key: key.count('/')):
+            manifest = json.loads(self.client_factory('s3').get_object(Bucket=bucket, Key=key)['Body'].read())
+            period = (manifest.get('billingPeriod') or {}).get('start') or key.rsplit('/', 1)[0]
+            if (key.rsplit('/', 1)[-1], period) in seen:
+                continue
+            seen.add((key.rsplit('/', 1)[-1], period))
+
+            # Skip periods entirely outside the cost windows before touching their data files
+            start, end = _period_bounds(manifest)
+            if (end and end <= self.earliest) or (start and start > self.as_of.strftime('%Y-%m-%d')):
+                logger.debug(f"Skipping CUR billing period {start} to {end} from {key}")
+                continue
+
+            for report_key in manifest.get('reportKeys', []):
+                yield f"s3://{bucket}/{report_key}"
+            # CUR 2.0 data exports list full URIs instead
+            yield from manifest.get('dataFiles', [])
+
+    def _add(self, resource_id, usage_date, cost, wanted):
+        """Fold one line item into the month-to-date and trailing-30-day totals"""
+        if usage_date < self.earliest:
+            return
+        resource_id = normalize_resource_id(resource_id)
+        if wanted is not None and resource_id not in wanted:
+            return
+
+        totals = self.costs.get(resource_id)
+        if totals is None:
+            totals = self.costs[resource_id] = [0.0, 0.0]
+        if usage_date >= self.month_start:
+            totals[0] += cost
+        if usage_date >= self.trailing_start:
+            totals[1] += cost
+
+    def _ingest_csv(self, location, wanted):
+        """Stream a gzip CSV file row by row without materializing it"""
+        if location.startswith('s3://'):
+            bucket, key = location[5:].split('/', 1)
+            raw = self.client_factory('s3').get_object(Bucket=bucket, Key=key)['Body']
+        else:
+            raw = open(location, 'rb')
+
+        with closing(raw), io.TextIOWrapper(gzip.GzipFile(fileobj=raw), encoding='utf-8', newline='') as text:
+            reader = csv.reader(text)
+            header = next(reader)
+            resource_idx = header.index(_pick_column(header, RESOURCE_COLUMNS))
+            date_idx = header.index(_pick_column(header, USAGE_START_COLUMNS))
+            cost_idx = header.index(_pick_column(header, self.cost_candidates))
+
+            for row in reader:
+                self.rows_processed += 1
+                resource_id = row[resource_idx]
+                if not resource_id:
+                    continue
+                try:
+                    cost = float(row[cost_idx])
+                except ValueError:
+                    continue
+                self._add(resource_id, row[date_idx][:10], cost, wanted)
+
+    def _ingest_parquet(self, location, wanted):
+        """Stream a Parquet file in record batches, reading only the needed columns"""
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required to ingest Parquet CUR files")
+
+        if location.startswith('s3://'):
+            source = pafs.S3FileSystem().open_input_file(location[5:])
+        else:
+            source = pa.OSFile(location, 'rb')
+
+        with source:
+            parquet_file = pq.ParquetFile(source)
+            names = parquet_file.schema_arrow.names
+            columns = [
+                _pick_column(names, RESOURCE_COLUMNS),
+                _pick_column(names, USAGE_START_COLUMNS),
+                _pick_column(names, self.cost_candidates)
+            ]
+
+            for batch in parquet_file.iter_batches(batch_size=PARQUET_BATCH_ROWS, columns=columns):
+                self.rows_processed += batch.num_rows
+                resource_col, date_col, cost_col = batch.columns
+                if pa.types.is_timestamp(date_col.type):
+                    date_col = pc.strftime(date_col, format='%Y-%m-%d')
+                else:
+                    date_col = pc.utf8_slice_codeunits(pc.cast(date_col, pa.string()), 0, 10)
+                cost_col = pc.cast(cost_col, pa.float64())
+
+                for resource_id, usage_date, cost in zip(
+                    resource_col.to_pylist(), date_col.to_pylist(), cost_col.to_pylist()
+                ):
+                    if resource_id and usage_date and cost is not None:
+                        self._add(resource_id, usage_date, cost, wanted)
+
+    def get_costs(self, resource_id):
+        """Return (month_to_date, trailing_30_day) cost for a resource, or None"""
+        totals = self.costs.get(resource_id)
+        return tuple(round(total, 2) for total in totals) if totals else None
+
+    def apply_to_findings(self, findings):
+        """Replace static savings estimates with actual trailing-30-day spend where known"""
+        matched = 0
+        for category in COST_CATEGORIES:
+            for item in findings.get(category, []):
+                known = [
+                    costs for costs in map(self.get_costs, finding_resource_ids(category, item)) if costs
+                ]
+                if not known:
+                    item['savings_source'] = 'estimate'
+                    continue
+
+                month_to_date = round(sum(costs[0] for costs in known), 2)
+                trailing = round(sum(costs[1] for costs in known), 2)
+                item['static_estimated_monthly_savings'] = item['estimated_monthly_savings']
+                item['month_to_date_cost'], item['trailing_30d_cost'] = month_to_date, trailing
+                item['estimated_monthly_savings'] = trailing
+                item['savings_source'] = 'cur'
+                matched += 1
+
+        logger.info(f"Joined CUR costs onto {matched} findings")
+        return matched
@@ -1,13 +1,42 @@
 import boto3
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import logging
 
 logger = logging.getLogger()
 
+# EBS pricing per GB/month
+EBS_PRICING_PER_GB = {
+    'gp2': 0.10,
+    'gp3': 0.08,
+    'io1': 0.125,
+    'io2': 0.125,
+    'st1': 0.045,
+    'sc1': 0.015
+}
+
+# GetMetricData accepts up to 500 metric queries per request
+METRIC_DATA_MAX_QUERIES = 500
+
+# EC2 accepts up to 200 values per describe filter
+DESCRIBE_FILTER_MAX_VALUES = 200
+
+
+def estimate_volume_cost(size_gb, volume_type):
+    """Estimate the monthly storage cost of an EBS volume"""
+    return round(size_gb * EBS_PRICING_PER_GB.get(volume_type, 0.10), 2)
+
 
 class EBSCleanup:
-    def __init__(self, region='us-east-1'):
-        self.ec2_client = boto3.client('ec2', region_name=region)
+    def __init__(self, region='us-east-1', client_factory=None, scan_time=None, full_metric_coverage=False):
+        client_factory = client_factory or boto3.client
+        self.ec2_client = client_factory('ec2', region_name=region)
+        self.cloudwatch = client_factory('cloudwatch', region_name=region)
+        self.scan_time = scan_time
+        self.full_metric_coverage = full_metric_coverage
+
+    def now(self):
+        """Reference time for age checks: the recording time on replays, else the wall clock"""
+        return self.scan_time or datetime.now()
 
     def get_unattached_volumes(self):
         """Detect unattached EBS volumes"""
@@ -19,21 +48,9 @@ class EBSCleanup:
             )
 
             for volume in response['Volumes']:
-                volume_id = volume['VolumeId']
-                size = volume['Size']
-                volume_type = volume['VolumeType']
-                create_time = volume['CreateTime']
-                
-                estimated_savings = self.estimate_ebs_savings(size, volume_type)
-                
-                unattached_volumes.append({
-                    'volume_id': volume_id,
-                    'size_gb': size,
-                    'volume_type': volume_type,
-                    'create_time': create_time.isoformat(),
-                    'estimated_monthly_savings': estimated_savings,
-                    'tags': {tag['Key']: tag['Value'] for tag in volume.get('Tags', [])}
-                })
+                finding = self.evaluate_volume(volume)
+                if finding:
+                    unattached_volumes.append(finding)
 
             logger.info(f"Found {len(unattached_volumes)} unattached EBS volumes")
             return unattached_volumes
@@ -42,31 +59,135 @@ class EBSCleanup:
             logger.error(f"Error detecting unattached EBS volumes: {e}")
             return []
 
+    def get_zero_io_volumes(self, days=14):
+        """Detect attached EBS volumes with no read or write operations over the lookback window"""
+        zero_io_volumes = []
+        end_time = self.now().astimezone(timezone.utc)
+        start_time = end_time - timedelta(days=days)
+
+        try:
+            volumes = {}
+            paginator = self.ec2_client.get_paginator('describe_volumes')
+            for page in paginator.paginate(Filters=[{'Name': 'status', 'Values': ['in-use']}]):
+                for volume in page['Volumes']:
+                    if volume.get('Attachments'):
+                        volumes[volume['VolumeId']] = volume
+
+            # Only volumes attached for the whole window can be judged
+            candidates = [
+                volume_id for volume_id, volume in volumes.items()
+                if all(a['AttachTime'] <= start_time for a in volume['Attachments'])
+            ]
+
+            # Recordings cover every in-use volume with both metrics so any window can be replayed;
+            # live scans read only the volumes that had no writes
+            if self.full_metric_coverage:
+                write_ops = self.sum_volume_metric('VolumeWriteOps', list(volumes), start_time, end_time)
+                read_ops = self.sum_volume_metric('VolumeReadOps', list(volumes), start_time, end_time)
+            else:
+                write_ops = self.sum_volume_metric('VolumeWriteOps', candidates, start_time, end_time)
+                no_writes = [volume_id for volume_id in candidates if write_ops.get(volume_id) == 0]
+                read_ops = self.sum_volume_metric('VolumeReadOps', no_writes, start_time, end_time)
+
+            for volume_id in candidates:
+                volume = volumes[volume_id]
+                if write_ops.get(volume_id) != 0 or read_ops.get(volume_id) != 0:
+                    continue
+                zero_io_volumes.append({
+                    'volume_id': volume_id,
+                    'size_gb': volume['Size'],
+                    'volume_type': volume['VolumeType'],
+                    'attached_instance_id': volume['Attachments'][0]['InstanceId'],
+                    'lookback_days': days,
+                    'read_ops': 0,
+                    'write_ops': 0,
+                    'estimated_monthly_savings': self.estimate_ebs_savings(volume['Size'], volume['VolumeType']),
+                    'tags': {tag['Key']: tag['Value'] for tag in volume.get('Tags', [])}
+                })
+
+            logger.info(f"Found {len(zero_io_volumes)} attached EBS volumes with zero I/O over {days} days")
+            return zero_io_volumes
+
+        except Exception as e:
+            logger.error(f"Error detecting zero-I/O EBS volumes: {e}")
+            return []
+
+    def sum_volume_metric(self, metric_name, volume_ids, start_time, end_time):
+        """Sum an AWS/EBS metric per volume over the window with batched GetMetricData calls"""
+        # Volumes without any datapoints (e.g. attached to stopped instances) are omitted
+        totals = {}
+        period = max(60, int((end_time - start_time).total_seconds()) // 60 * 60)
+        paginator = self.cloudwatch.get_paginator('get_metric_data')
+
+        for start in range(0, len(volume_ids), METRIC_DATA_MAX_QUERIES):
+            batch = volume_ids[start:start + METRIC_DATA_MAX_QUERIES]
+            queries = [
+                {
+                    'Id': f"v{index}",
+                    'MetricStat': {
+                        'Metric': {
+                            'Namespace': 'AWS/EBS',
+                            'MetricName': metric_name,
+                            'Dimensions': [{'Name': 'VolumeId', 'Value': volume_id}]
+                        },
+                        'Period': period,
+                        'Stat': 'Sum'
+                    }
+                }
+                for index, volume_id in enumerate(batch)
+            ]
+
+            for page in paginator.paginate(MetricDataQueries=queries, StartTime=start_time, EndTime=end_time):
+                for result in page['MetricDataResults']:
+                    if result['Values']:
+                        volume_id = batch[int(result['Id'][1:])]
+                        totals[volume_id] = totals.get(volume_id, 0.0) + sum(result['Values'])
+
+        return totals
+
+    def describe_volumes(self, volume_ids):
+        """Fetch volumes by ID in batched describes; IDs missing from the result no longer exist"""
+        volumes = {}
+        paginator = self.ec2_client.get_paginator('describe_volumes')
+        for start in range(0, len(volume_ids), DESCRIBE_FILTER_MAX_VALUES):
+            batch = volume_ids[start:start + DESCRIBE_FILTER_MAX_VALUES]
+            for page in paginator.paginate(Filters=[{'Name': 'volume-id', 'Values': batch}]):
+                for volume in page['Volumes']:
+                    volumes[volume['VolumeId']] = volume
+        return volumes
+
+    def evaluate_volume(self, volume):
+        """Return an unattached-volume finding if the volume is available, else None"""
+        if volume.get('State', 'available') != 'available':
+            return None
+
+        volume_id = volume['VolumeId']
+        size = volume['Size']
+        volume_type = volume['VolumeType']
+        create_time = volume['CreateTime']
+        
+        estimated_savings = self.estimate_ebs_savings(size, volume_type)
+        
+        return {
+            'volume_id': volume_id,
+            'size_gb': size,
+            'volume_type': volume_type,
+            'create_time': create_time.isoformat(),
+            'estimated_monthly_savings': estimated_savings,
+            'tags': {tag['Key']: tag['Value'] for tag in volume.get('Tags', [])}
+        }
+
     def get_old_snapshots(self, days=90):
         """Detect old EBS snapshots"""
         old_snapshots = []
-        cutoff_date = datetime.now(datetime.now().astimezone().tzinfo) - timedelta(days=days)
 
         try:
             response = self.ec2_client.describe_snapshots(OwnerIds=['self'])
 
             for snapshot in response['Snapshots']:
-                snapshot_id = snapshot['SnapshotId']
-                start_time = snapshot['StartTime']
-
-                if start_time < cutoff_date:
-                    volume_size = snapshot['VolumeSize']
-                    estimated_savings = self.estimate_snapshot_savings(volume_size)
-                    
-                    old_snapshots.append({
-                        'snapshot_id': snapshot_id,
-                        'volume_id': snapshot.get('VolumeId', 'N/A'),
-                        'size_gb': volume_size,
-                        'start_time': start_time.isoformat(),
-                        'age_days': (datetime.now(datetime.now().astimezone().tzinfo) - start_time).days,
-                        'estimated_monthly_savings': estimated_savings,
-                        'tags': {tag['Key']: tag['Value'] for tag in snapshot.get('Tags', [])}
-                    })
+                finding = self.evaluate_snapshot(snapshot, days)
+                if finding:
+                    old_snapshots.append(finding)
 
             logger.info(f"Found {len(old_snapshots)} old snapshots (>{days} days)")
             return old_snapshots
@@ -75,20 +196,31 @@ class EBSCleanup:
             logger.error(f"Error detecting old snapshots: {e}")
             return []
 
+    def evaluate_snapshot(self, snapshot, days=90):
+        """Return an old-snapshot finding if the snapshot predates the cutoff, else None"""
+        now = self.now().astimezone()
+        cutoff_date = now - timedelta(days=days)
+        start_time = snapshot['StartTime']
+
+        if start_time >= cutoff_date:
+            return None
+
+        volume_size = snapshot['VolumeSize']
+        estimated_savings = self.estimate_snapshot_savings(volume_size)
+        
+        return {
+            'snapshot_id': snapshot['SnapshotId'],
+            'volume_id': snapshot.get('VolumeId', 'N/A'),
+            'size_gb': volume_size,
+            'start_time': start_time.isoformat(),
+            'age_days': (now - start_time).days,
+            'estimated_monthly_savings': estimated_savings,
+            'tags': {tag['Key']: tag['Value'] for tag in snapshot.get('Tags', [])}
+        }
+
     def estimate_ebs_savings(self, size_gb, volume_type):
         """Estimate monthly cost savings for EBS volume"""
-        # Pricing per GB/month
-        pricing_per_gb = {
-            'gp2': 0.10,
-            'gp3': 0.08,
-            'io1': 0.125,
-            'io2': 0.125,
-            'st1': 0.045,
-            'sc1': 0.015
-        }
-        
-        price_per_gb = pricing_per_gb.get(volume_type, 0.10)
-        return round(size_gb * price_per_gb, 2)
+        return estimate_volume_cost(size_gb, volume_type)
 
     def estimate_snapshot_savings(self, size_gb):
         """Estimate monthly cost savings for snapshot"""
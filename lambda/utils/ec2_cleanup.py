@@ -1,49 +1,50 @@
 import boto3
 from datetime import datetime, timedelta
 import logging
+import re
+
+from utils.ebs_cleanup import DESCRIBE_FILTER_MAX_VALUES, estimate_volume_cost
 
 logger = logging.getLogger()
 
+# Public IPv4 / Elastic IP charge: $0.005 per hour
+ELASTIC_IP_MONTHLY_COST = 3.65
+
+# Timestamp embedded in reasons such as "User initiated (2024-01-31 12:00:00 GMT)"
+STOP_TIME_PATTERN = re.compile(r'\((\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) (?:GMT|UTC)\)')
+
 
 class EC2Cleanup:
-    def __init__(self, region='us-east-1'):
-        self.ec2_client = boto3.client('ec2', region_name=region)
-        self.cloudwatch = boto3.client('cloudwatch', region_name=region)
+    def __init__(self, region='us-east-1', client_factory=None, stop_time_index=None, scan_time=None):
+        client_factory = client_factory or boto3.client
+        self.ec2_client = client_factory('ec2', region_name=region)
+        self.stop_time_index = stop_time_index
+        self.scan_time = scan_time
+
+    def now(self):
+        """Reference time for age checks: the recording time on replays, else the wall clock"""
+        return self.scan_time or datetime.now()
 
     def get_idle_instances(self, idle_days=7):
         """Detect EC2 instances stopped for more than specified days"""
         idle_instances = []
-        stopped_threshold = datetime.now() - timedelta(days=idle_days)
 
         try:
             response = self.ec2_client.describe_instances(
                 Filters=[{'Name': 'instance-state-name', 'Values': ['stopped']}]
             )
+            self.refresh_stop_times()
 
-            for reservation in response['Reservations']:
-                for instance in reservation['Instances']:
-                    instance_id = instance['InstanceId']
-                    state_transition = instance.get('StateTransitionReason', '')
-                    
-                    # Extract stop time from state transition reason
-                    if 'User initiated' in state_transition:
-                        try:
-                            # Parse stop date from state transition
-                            stop_time_str = state_transition.split('(')[1].split(')')[0]
-                            stop_time = datetime.strptime(stop_time_str, '%Y-%m-%d %H:%M:%S %Z')
-                            
-                            if stop_time < stopped_threshold:
-                                estimated_savings = self.estimate_ec2_savings(instance)
-                                idle_instances.append({
-                                    'instance_id': instance_id,
-                                    'instance_type': instance['InstanceType'],
-                                    'stopped_date': stop_time.isoformat(),
-                                    'days_stopped': (datetime.now() - stop_time).days,
-                                    'estimated_monthly_savings': estimated_savings,
-                                    'tags': {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
-                                })
-                        except Exception as e:
-                            logger.warning(f"Could not parse stop time for {instance_id}: {e}")
+            # Indexed whenever anything is stopped, not only when something is idle,
+            # so recorded archives can be replayed with any threshold
+            instances = [
+                instance for reservation in response['Reservations'] for instance in reservation['Instances']
+            ]
+            attachment_index = self.build_attachment_index() if instances else None
+            for instance in instances:
+                finding = self.evaluate_instance(instance, idle_days, attachment_index)
+                if finding:
+                    idle_instances.append(finding)
             
             logger.info(f"Found {len(idle_instances)} idle EC2 instances")
             return idle_instances
@@ -52,6 +53,135 @@ class EC2Cleanup:
             logger.error(f"Error detecting idle EC2 instances: {e}")
             return []
 
+    def describe_instances(self, instance_ids):
+        """Fetch instances by ID in batched describes; IDs missing from the result no longer exist"""
+        instances = {}
+        paginator = self.ec2_client.get_paginator('describe_instances')
+        for start in range(0, len(instance_ids), DESCRIBE_FILTER_MAX_VALUES):
+            batch = instance_ids[start:start + DESCRIBE_FILTER_MAX_VALUES]
+            # Unlike InstanceIds, a filter does not fail the whole call on one missing ID
+            for page in paginator.paginate(Filters=[{'Name': 'instance-id', 'Values': batch}]):
+                for reservation in page['Reservations']:
+                    for instance in reservation['Instances']:
+                        instances[instance['InstanceId']] = instance
+        return instances
+
+    def refresh_stop_times(self):
+        """Bring the CloudTrail stop-time index up to date; on failure only the reason fallback is used"""
+        if self.stop_time_index is None:
+            return
+        try:
+            self.stop_time_index.refresh()
+        except Exception as e:
+            logger.warning(f"Could not refresh stop-time index from CloudTrail: {e}")
+
+    def get_stop_time(self, instance):
+        """Resolve the stop time as the later of the CloudTrail index and the StateTransitionReason timestamp"""
+        candidates = []
+        if self.stop_time_index is not None:
+            candidates.append(self.stop_time_index.lookup(instance['InstanceId']))
+
+        # The reason reflects the latest stop even when the index has not swept it yet
+        match = STOP_TIME_PATTERN.search(instance.get('StateTransitionReason', ''))
+        if match:
+            candidates.append(datetime.strptime(match.group(1), '%Y-%m-%d %H:%M:%S'))
+
+        candidates = [stop_time for stop_time in candidates if stop_time]
+        if not candidates:
+            logger.debug(f"No stop time known for {instance['InstanceId']}")
+            return None
+        return max(candidates)
+
+    def is_idle(self, instance, idle_days=7):
+        """Check whether an instance has been stopped for longer than idle_days"""
+        if instance.get('State', {}).get('Name', 'stopped') != 'stopped':
+            return False
+
+        stop_time = self.get_stop_time(instance)
+        return stop_time is not None and stop_time < self.now() - timedelta(days=idle_days)
+
+    def evaluate_instance(self, instance, idle_days=7, attachment_index=None):
+        """Return an idle finding for a stopped instance past the threshold, else None"""
+        if not self.is_idle(instance, idle_days):
+            return None
+
+        instance_id = instance['InstanceId']
+        stop_time = self.get_stop_time(instance)
+        if attachment_index is None:
+            attachment_index = self.build_attachment_index([instance_id])
+
+        finding = {
+            'instance_id': instance_id,
+            'instance_type': instance['InstanceType'],
+            'stopped_date': stop_time.isoformat(),
+            'days_stopped': (self.now() - stop_time).days,
+            'tags': {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
+        }
+        finding.update(self.estimate_stopped_instance_savings(instance, attachment_index))
+        return finding
+
+    def build_attachment_index(self, instance_ids=None):
+        """Index attached volumes and Elastic IPs by instance with one paginated pass over each"""
+        volume_filters = [{'Name': 'attachment.status', 'Values': ['attached']}]
+        address_filters = []
+        # Larger ID sets than one filter holds are served by the unfiltered index
+        if instance_ids and len(instance_ids) <= DESCRIBE_FILTER_MAX_VALUES:
+            volume_filters.append({'Name': 'attachment.instance-id', 'Values': list(instance_ids)})
+            address_filters.append({'Name': 'instance-id', 'Values': list(instance_ids)})
+
+        volumes = []
+        paginator = self.ec2_client.get_paginator('describe_volumes')
+        for page in paginator.paginate(Filters=volume_filters):
+            volumes.extend(page['Volumes'])
+
+        addresses = self.ec2_client.describe_addresses(Filters=address_filters)['Addresses']
+        return self.index_attachments(volumes, addresses)
+
+    def index_attachments(self, volumes, addresses):
+        """Build instance-ID hash indexes over volume and address inventories"""
+        volume_index = {}
+        for volume in volumes:
+            for attachment in volume.get('Attachments', []):
+                volume_index.setdefault(attachment['InstanceId'], []).append({
+                    'volume_id': volume['VolumeId'],
+                    'size_gb': volume['Size'],
+                    'volume_type': volume['VolumeType'],
+                    'delete_on_termination': attachment.get('DeleteOnTermination', False),
+                    'monthly_cost': estimate_volume_cost(volume['Size'], volume['VolumeType'])
+                })
+
+        address_index = {}
+        for address in addresses:
+            if address.get('InstanceId'):
+                address_index.setdefault(address['InstanceId'], []).append({
+                    'public_ip': address.get('PublicIp'),
+                    'allocation_id': address.get('AllocationId')
+                })
+
+        return {'volumes': volume_index, 'addresses': address_index}
+
+    def estimate_stopped_instance_savings(self, instance, attachment_index):
+        """Estimate savings for a stopped instance from the storage and addresses it holds"""
+        instance_id = instance['InstanceId']
+        volumes = attachment_index['volumes'].get(instance_id, [])
+        addresses = attachment_index['addresses'].get(instance_id, [])
+
+        # Stopped instances incur no compute charge; volumes kept on termination are not freed,
+        # and Elastic IPs are only disassociated, billing until the allocation is released
+        storage_savings = sum(v['monthly_cost'] for v in volumes if v['delete_on_termination'])
+        retained_storage = sum(v['monthly_cost'] for v in volumes if not v['delete_on_termination'])
+        retained_addresses = len(addresses) * ELASTIC_IP_MONTHLY_COST
+
+        return {
+            'attached_volumes': volumes,
+            'elastic_ips': addresses,
+            'storage_monthly_savings': round(storage_savings, 2),
+            'retained_storage_monthly_cost': round(retained_storage, 2),
+            'retained_elastic_ip_monthly_cost': round(retained_addresses, 2),
+            'running_compute_monthly_cost': self.estimate_ec2_savings(instance),
+            'estimated_monthly_savings': round(storage_savings, 2)
+        }
+
     def estimate_ec2_savings(self, instance):
         """Estimate monthly cost savings for terminated instance"""
         instance_type = instance['InstanceType']
@@ -0,0 +1,273 @@
+import boto3
+import json
+import logging
+import random
+import time
+from datetime import datetime
+
+logger = logging.getLogger()
+
+
+# Finding categories persisted in the current-findings state, mapped to their ID field
+STATE_CATEGORIES = {
+    'idle_ec2_instances': 'instance_id',
+    'idle_rds_instances': 'db_instance_id',
+    'unattached_ebs_volumes': 'volume_id',
+    'zero_io_ebs_volumes': 'volume_id',
+    'old_snapshots': 'snapshot_id',
+    'non_compliant_resources': 'resource_id'
+}
+
+# Full-jitter backoff between conditional-write retries on the findings state
+STATE_WRITE_BASE_DELAY = 0.1
+STATE_WRITE_MAX_DELAY = 2.0
+
+EC2_TAG_EVENTS = {'CreateTags', 'DeleteTags'}
+RDS_TAG_EVENTS = {'AddTagsToResource', 'RemoveTagsFromResource'}
+
+
+def conditional_put(s3_client, params, etag):
+    """PutObject only if the object is unchanged since it was read at etag (or still absent); returns the new ETag"""
+    guarded = dict(params, **({'IfMatch': etag} if etag else {'IfNoneMatch': '*'}))
+    try:
+        return s3_client.put_object(**guarded).get('ETag')
+    except Exception as e:
+        # botocore releases before late 2024 reject IfMatch/IfNoneMatch client-side
+        if 'Unknown parameter' not in str(e):
+            raise
+        logger.warning(
+            f"This botocore does not support S3 conditional writes; "
+            f"writing s3://{params['Bucket']}/{params['Key']} unconditionally"
+        )
+        return s3_client.put_object(**params).get('ETag')
+
+
+def finding_key(category, finding):
+    """Key a finding within its category; non-compliant findings span resource types"""
+    resource_id = finding[STATE_CATEGORIES[category]]
+    if category == 'non_compliant_resources':
+        return f"{finding['resource_type']}:{resource_id}"
+    return resource_id
+
+
+def _resource_type_for_id(resource_id):
+    """Map an EC2-namespace resource ID to the scanner resource type"""
+    if resource_id.startswith('i-'):
+        return 'EC2'
+    if resource_id.startswith('vol-'):
+        return 'EBS'
+    return None
+
+
+def parse_resource_event(event):
+    """Extract (resource_type, resource_id) targets from an EventBridge or CloudTrail event"""
+    detail_type = event.get('detail-type', '')
+    detail = event.get('detail') or {}
+    targets = []
+
+    if detail_type == 'EC2 Instance State-change Notification':
+        targets.append(('EC2', detail['instance-id']))
+
+    elif detail_type == 'EBS Volume Notification':
+        for arn in event.get('resources', []):
+            targets.append(('EBS', arn.split('/')[-1]))
+
+    elif detail_type == 'RDS DB Instance Event':
+        targets.append(('RDS', detail['SourceIdentifier']))
+
+    elif detail_type == 'AWS API Call via CloudTrail':
+        event_name = detail.get('eventName')
+        params = detail.get('requestParameters') or {}
+
+        if event_name in EC2_TAG_EVENTS:
+            for item in (params.get('resourcesSet') or {}).get('items', []):
+                resource_type = _resource_type_for_id(item.get('resourceId', ''))
+                if resource_type:
+                    targets.append((resource_type, item['resourceId']))
+
+        elif event_name in RDS_TAG_EVENTS:
+            arn = params.get('resourceName', '')
+            if ':db:' in arn:
+                targets.append(('RDS', arn.split(':db:')[-1]))
+
+    # De-duplicate while keeping event order
+    return list(dict.fromkeys(targets))
+
+
+class FindingsState:
+    """Current findings persisted in S3, keyed by category and resource"""
+
+    def __init__(self, bucket, key='state/current-findings.json', client_factory=None):
+        self.bucket = bucket
+        self.key = key
+        self.s3_client = (client_factory or boto3.client)('s3')
+        self.findings = {category: {} for category in STATE_CATEGORIES}
+        self.updated_at = None
+        self.etag = None
+
+    def load(self):
+        """Load the persisted state, starting empty if none exists yet"""
+        self.findings = {category: {} for category in STATE_CATEGORIES}
+        self.etag = None
+
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=self.key)
+            data = json.loads(response['Body'].read())
+            self.etag = response.get('ETag')
+            self.updated_at = data.get('updated_at')
+            for category, items in data.get('findings', {}).items():
+                self.findings.setdefault(category, {}).update(items)
+        except Exception as e:
+            if 'NoSuchKey' not in str(e):
+                raise
+            logger.info(f"No findings state at s3://{self.bucket}/{self.key}, starting empty")
+
+    def save(self, conditional=True):
+        """Persist the state; returns False if another writer updated it since load()"""
+        self.updated_at = datetime.now().isoformat()
+        params = {
+            'Bucket': self.bucket,
+            'Key': self.key,
+            'Body': json.dumps({'updated_at': self.updated_at, 'findings': self.findings}),
+            'ContentType': 'application/json'
+        }
+        try:
+            if conditional:
+                self.etag = conditional_put(self.s3_client, params, self.etag)
+            else:
+                self.etag = self.s3_client.put_object(**params).get('ETag')
+            return True
+        except Exception as e:
+            if 'PreconditionFailed' in str(e) or 'ConditionalRequestConflict' in str(e):
+                logger.warning("Findings state changed concurrently, retrying")
+                return False
+            raise
+
+    def replace_all(self, findings):
+        """Replace the state with the findings of a full reconciliation scan"""
+        self.findings = {
+            category: {finding_key(category, item): item for item in findings.get(category, [])}
+            for category in STATE_CATEGORIES
+        }
+
+    def apply(self, updates):
+        """Apply (category, key, finding) updates; a None finding clears the resource"""
+        for category, key, finding in updates:
+            if finding is None:
+                self.findings[category].pop(key, None)
+            else:
+                self.findings[category][key] = finding
+
+    def as_report_findings(self):
+        """Return the state in the report's list-per-category layout"""
+        return {category: list(items.values()) for category, items in self.findings.items()}
+
+
+class IncrementalScanner:
+    """Re-evaluates the resources named by change events with batched API calls per event"""
+
+    def __init__(self, ec2_cleanup, rds_cleanup, ebs_cleanup, tagging_enforcer,
+                 idle_ec2_days=7, idle_rds_days=7):
+        self.ec2_cleanup = ec2_cleanup
+        self.rds_cleanup = rds_cleanup
+        self.ebs_cleanup = ebs_cleanup
+        self.tagging_enforcer = tagging_enforcer
+        self.idle_ec2_days = idle_ec2_days
+        self.idle_rds_days = idle_rds_days
+
+    def evaluate(self, targets):
+        """Return state updates for all targets, describing each resource type in batched calls"""
+        ids_by_type = {}
+        for resource_type, resource_id in targets:
+            ids_by_type.setdefault(resource_type, []).append(resource_id)
+
+        updates = []
+        for resource_type, resource_ids in ids_by_type.items():
+            try:
+                if resource_type == 'EC2':
+                    updates.extend(self._evaluate_ec2(resource_ids))
+                elif resource_type == 'EBS':
+                    updates.extend(self._evaluate_ebs(resource_ids))
+                elif resource_type == 'RDS':
+                    updates.extend(self._evaluate_rds(resource_ids))
+                else:
+                    logger.warning(f"Unsupported resource type for incremental scan: {resource_type}")
+            except Exception as e:
+                logger.error(f"Error evaluating {len(resource_ids)} {resource_type} resources: {e}")
+        return updates
+
+    def _evaluate_ec2(self, instance_ids):
+        instances = self.ec2_cleanup.describe_instances(instance_ids)
+        idle_ids = [
+            instance_id for instance_id, instance in instances.items()
+            if self.ec2_cleanup.is_idle(instance, self.idle_ec2_days)
+        ]
+        attachment_index = self.ec2_cleanup.build_attachment_index(idle_ids) if idle_ids else None
+
+        updates = []
+        for instance_id in instance_ids:
+            instance = instances.get(instance_id)
+            tag_key = f"EC2:{instance_id}"
+            if instance is None:
+                updates += [('idle_ec2_instances', instance_id, None), ('non_compliant_resources', tag_key, None)]
+                continue
+            updates += [
+                ('idle_ec2_instances', instance_id,
+                 self.ec2_cleanup.evaluate_instance(instance, self.idle_ec2_days, attachment_index)),
+                ('non_compliant_resources', tag_key, self.tagging_enforcer.evaluate_ec2_instance(instance))
+            ]
+        return updates
+
+    def _evaluate_ebs(self, volume_ids):
+        volumes = self.ebs_cleanup.describe_volumes(volume_ids)
+
+        updates = []
+        for volume_id in volume_ids:
+            volume = volumes.get(volume_id)
+            tag_key = f"EBS:{volume_id}"
+            if volume is None:
+                updates += [
+                    ('unattached_ebs_volumes', volume_id, None),
+                    ('zero_io_ebs_volumes', volume_id, None),
+                    ('non_compliant_resources', tag_key, None)
+                ]
+                continue
+            updates += [
+                ('unattached_ebs_volumes', volume_id, self.ebs_cleanup.evaluate_volume(volume)),
+                ('non_compliant_resources', tag_key, self.tagging_enforcer.evaluate_ebs_volume(volume))
+            ]
+            # Zero-I/O findings need a metric window; events can only clear them on detach
+            if volume['State'] != 'in-use':
+                updates.append(('zero_io_ebs_volumes', volume_id, None))
+        return updates
+
+    def _evaluate_rds(self, db_ids):
+        # RDS events name a single instance each
+        updates = []
+        for db_id in db_ids:
+            db_instance = self.rds_cleanup.describe_instance(db_id)
+            tag_key = f"RDS:{db_id}"
+            if db_instance is None:
+                updates += [('idle_rds_instances', db_id, None), ('non_compliant_resources', tag_key, None)]
+                continue
+            updates += [
+                ('idle_rds_instances', db_id, self.rds_cleanup.evaluate_instance(db_instance, self.idle_rds_days)),
+                ('non_compliant_resources', tag_key, self.tagging_enforcer.evaluate_rds_instance(db_instance))
+            ]
+        return updates
+
+    def process(self, targets, state, max_attempts=6):
+        """Evaluate targets and merge the results into the persisted state"""
+        updates = self.evaluate(targets)
+
+        for attempt in range(max_attempts):
+            if attempt:
+                # Concurrent events (e.g. a scale-out) contend for the same object; spread retries out
+                time.sleep(random.uniform(0, min(STATE_WRITE_MAX_DELAY, STATE_WRITE_BASE_DELAY * 2 ** attempt)))
+            state.load()
+            state.apply(updates)
+            if state.save():
+                logger.info(f"Applied {len(updates)} incremental updates for {len(targets)} resources")
+                return updates
+
+        raise RuntimeError("Could not update findings state after concurrent modifications")
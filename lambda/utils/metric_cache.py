@@ -0,0 +1,145 @@
+import boto3
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+
+from utils.incremental_scan import conditional_put
+
+logger = logging.getLogger()
+
+# Conditional writes retried this many times before a concurrent writer wins
+SAVE_MAX_ATTEMPTS = 5
+
+
+class MetricCache:
+    """Daily CloudWatch aggregates per resource and metric, persisted between runs.
+
+    Only complete UTC days are cached. Each run fetches the missing tail of the
+    window (at minimum the current partial day) and computes rolling averages
+    from the cached days plus that tail.
+    """
+
+    def __init__(self, location, max_days=30, client_factory=None):
+        self.location = location
+        self.max_days = max_days
+        self.client_factory = client_factory or boto3.client
+        self.series = None
+        self.partial = {}
+        self.touched = set()
+        self.etag = None
+
+    def load(self):
+        """Load the cache from a local path or s3://bucket/key; a no-op once loaded"""
+        if self.series is not None:
+            return
+        self.series, self.etag = self._read()
+        if self.series:
+            logger.info(f"Loaded metric cache with {len(self.series)} series from {self.location}")
+
+    def _read(self):
+        """Fetch the persisted series and, for S3, the ETag they were read at"""
+        try:
+            if self.location.startswith('s3://'):
+                bucket, key = self.location[5:].split('/', 1)
+                response = self.client_factory('s3').get_object(Bucket=bucket, Key=key)
+                return json.loads(response['Body'].read()).get('series', {}), response.get('ETag')
+            with open(self.location, 'rb') as f:
+                return json.loads(f.read()).get('series', {}), None
+        except Exception as e:
+            if 'NoSuchKey' not in str(e) and not isinstance(e, FileNotFoundError):
+                logger.warning(f"Could not load metric cache from {self.location}: {e}")
+            return {}, None
+
+    def save(self, prune=True, max_attempts=SAVE_MAX_ATTEMPTS):
+        """Persist the cache, optionally evicting series not seen this run and days past max_days.
+
+        S3 writes are conditional on the ETag read at load time; when a concurrent
+        run has written since, its series are merged under ours and the write retried.
+        """
+        if self.series is None:
+            return
+
+        for attempt in range(max_attempts):
+            if prune:
+                cutoff = (datetime.now(timezone.utc).date() - timedelta(days=self.max_days)).isoformat()
+                self.series = {
+                    key: {day: value for day, value in days.items() if day >= cutoff}
+                    for key, days in self.series.items()
+                    if key in self.touched
+                }
+
+            body = json.dumps({'updated_at': datetime.now().isoformat(), 'series': self.series})
+            try:
+                if self.location.startswith('s3://'):
+                    bucket, key = self.location[5:].split('/', 1)
+                    params = {'Bucket': bucket, 'Key': key, 'Body': body, 'ContentType': 'application/json'}
+                    self.etag = conditional_put(self.client_factory('s3'), params, self.etag)
+                else:
+                    with open(self.location, 'w') as f:
+                        f.write(body)
+                logger.info(f"Saved metric cache with {len(self.series)} series to {self.location}")
+                return
+            except Exception as e:
+                if 'PreconditionFailed' not in str(e) and 'ConditionalRequestConflict' not in str(e):
+                    logger.error(f"Error saving metric cache: {e}")
+                    return
+                logger.warning("Metric cache changed concurrently, merging and retrying")
+                remote, self.etag = self._read()
+                for key, days in self.series.items():
+                    remote.setdefault(key, {}).update(days)
+                self.series = remote
+
+        logger.error(f"Giving up saving metric cache after {max_attempts} conflicting writes")
+
+    @staticmethod
+    def series_key(namespace, metric_name, dimensions, statistic):
+        dims = ','.join(f"{d['Name']}={d['Value']}" for d in sorted(dimensions, key=lambda d: d['Name']))
+        return f"{namespace}|{metric_name}|{dims}|{statistic}"
+
+    def missing_query(self, namespace, metric_name, dimensions, days, statistic='Average'):
+        """Build GetMetricStatistics parameters covering only the uncached tail of the window"""
+        self.load()
+        key = self.series_key(namespace, metric_name, dimensions, statistic)
+        cached = self.series.get(key, {})
+
+        today = datetime.now(timezone.utc).date()
+        first_missing = today
+        for offset in range(days, 0, -1):
+            day = today - timedelta(days=offset)
+            if day.isoformat() not in cached:
+                first_missing = day
+                break
+
+        return {
+            'Namespace': namespace,
+            'MetricName': metric_name,
+            'Dimensions': dimensions,
+            'StartTime': datetime.combine(first_missing, datetime.min.time(), tzinfo=timezone.utc),
+            'EndTime': datetime.now(timezone.utc),
+            'Period': 86400,  # 1 day
+            'Statistics': [statistic]
+        }
+
+    def update(self, query, datapoints, days):
+        """Merge fetched datapoints into the cache and return the datapoints for the whole window"""
+        self.load()
+        statistic = query['Statistics'][0]
+        key = self.series_key(query['Namespace'], query['MetricName'], query['Dimensions'], statistic)
+        cached = self.series.setdefault(key, {})
+        self.touched.add(key)
+
+        today = datetime.now(timezone.utc).date()
+        fetched = {dp['Timestamp'].astimezone(timezone.utc).date(): dp[statistic] for dp in datapoints}
+
+        # Record every complete fetched day, including days without data, so they are not refetched
+        day = query['StartTime'].date()
+        while day < today:
+            cached[day.isoformat()] = fetched.get(day)
+            day += timedelta(days=1)
+        self.partial[key] = fetched.get(today)
+
+        window_start = (today - timedelta(days=days)).isoformat()
+        values = [value for day, value in cached.items() if day >= window_start and value is not None]
+        if self.partial[key] is not None:
+            values.append(self.partial[key])
+        return [{statistic: value} for value in values]
@@ -0,0 +1,120 @@
+import boto3
+import cProfile
+import io
+import json
+import logging
+import marshal
+import pstats
+import time
+import tracemalloc
+
+logger = logging.getLogger()
+
+
+class NullProfiler:
+    """Stand-in used when profiling is off; every hook is a no-op"""
+
+    enabled = False
+
+    def start(self):
+        pass
+
+    def mark(self, phase):
+        pass
+
+    def stop(self):
+        pass
+
+
+class ScanProfiler:
+    """cProfile and tracemalloc capture for one invocation, split into scanner phases"""
+
+    enabled = True
+
+    def __init__(self, top_n=25, trace_frames=1):
+        self.top_n = top_n
+        self.trace_frames = trace_frames
+        self.profile = cProfile.Profile()
+        self.phases = []
+        self.snapshot = None
+        self._current = None
+
+    def start(self):
+        """Begin CPU profiling and allocation tracing"""
+        tracemalloc.start(self.trace_frames)
+        self.profile.enable()
+        self.mark('setup')
+
+    def mark(self, phase):
+        """Close the running phase and start timing the next one"""
+        now = (time.perf_counter(), time.process_time())
+        current_memory, peak_memory = tracemalloc.get_traced_memory()
+
+        if self._current:
+            name, wall_start, cpu_start, memory_start = self._current
+            self.phases.append({
+                'phase': name,
+                'wall_seconds': round(now[0] - wall_start, 4),
+                'cpu_seconds': round(now[1] - cpu_start, 4),
+                'allocated_bytes': current_memory - memory_start,
+                'peak_traced_bytes': peak_memory
+            })
+
+        self._current = (phase, now[0], now[1], current_memory) if phase else None
+        tracemalloc.reset_peak()
+
+    def stop(self):
+        """Finish the last phase and stop profiling"""
+        self.mark(None)
+        self.profile.disable()
+        self.snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+    def summary(self):
+        """Build the top-N hotspot summary from the captured profile and allocations"""
+        stats = pstats.Stats(self.profile)
+        hotspots = []
+        for (filename, line, function), (_, calls, own_time, cumulative, _) in sorted(
+            stats.stats.items(), key=lambda item: item[1][3], reverse=True
+        )[:self.top_n]:
+            hotspots.append({
+                'function': f"{filename}:{line}({function})",
+                'calls': calls,
+                'own_seconds': round(own_time, 4),
+                'cumulative_seconds': round(cumulative, 4)
+            })
+
+        allocations = [
+            {'location': str(stat.traceback), 'size_bytes': stat.size, 'count': stat.count}
+            for stat in self.snapshot.statistics('lineno')[:self.top_n]
+        ]
+
+        return {
+            'phases': self.phases,
+            'cpu_hotspots': hotspots,
+            'allocation_hotspots': allocations
+        }
+
+    def upload(self, bucket, key_prefix, client_factory=None):
+        """Upload the raw pstats profile and the hotspot summary next to the report"""
+        s3_client = (client_factory or boto3.client)('s3')
+
+        stats_buffer = io.StringIO()
+        pstats.Stats(self.profile, stream=stats_buffer).sort_stats('cumulative').print_stats(self.top_n)
+        summary = self.summary()
+        summary['pstats_text'] = stats_buffer.getvalue()
+
+        # Same marshal format pstats.Stats(filename) reads back
+        self.profile.create_stats()
+        profile_key = f"{key_prefix}.profile.pstats"
+        s3_client.put_object(Bucket=bucket, Key=profile_key, Body=marshal.dumps(self.profile.stats))
+        summary_key = f"{key_prefix}.profile-summary.json"
+        s3_client.put_object(
+            Bucket=bucket,
+            Key=summary_key,
+            Body=json.dumps(summary, indent=2),
+            ContentType='application/json'
+        )
+
+        logger.info(f"Profile uploaded to s3://{bucket}/{profile_key}")
+        return summary_key
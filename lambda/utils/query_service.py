@@ -0,0 +1,352 @@
+import argparse
+import bisect
+import heapq
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Allow running as a script from the lambda/ directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.incremental_scan import STATE_CATEGORIES, finding_key
+from utils.report_store import ReportStore
+
+logger = logging.getLogger()
+
+
+# Resource type of each finding category; non-compliant findings carry their own
+CATEGORY_RESOURCE_TYPES = {
+    'idle_ec2_instances': 'EC2',
+    'idle_rds_instances': 'RDS',
+    'unattached_ebs_volumes': 'EBS',
+    'zero_io_ebs_volumes': 'EBS',
+    'old_snapshots': 'Snapshot'
+}
+
+# Comparison operators accepted in where-clauses, longest first so '>=' wins over '>'
+WHERE_OPERATORS = {
+    '>=': lambda a, b: a >= b,
+    '<=': lambda a, b: a <= b,
+    '!=': lambda a, b: a != b,
+    '>': lambda a, b: a > b,
+    '<': lambda a, b: a < b,
+    '=': lambda a, b: a == b
+}
+
+
+def _coerce(value):
+    """Interpret a query-string value as a number when it looks like one"""
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def parse_where(clause):
+    """Split 'size_gb>=500' into (field, operator, value)"""
+    for operator in WHERE_OPERATORS:
+        field, found, value = clause.partition(operator)
+        if found:
+            return field.strip(), operator, _coerce(value.strip())
+    raise ValueError(f"Invalid where clause: {clause}")
+
+
+class FindingsIndex:
+    """Findings held in memory with secondary indexes on tags, region, resource type and savings"""
+
+    def __init__(self):
+        self.records = {}
+        self.by_tag = {}
+        self.by_tag_key = {}
+        self.by_region = {}
+        self.by_type = {}
+        self.by_category = {}
+        self.by_savings = []
+
+    @staticmethod
+    def build_records(report):
+        """Flatten a report's findings into records keyed by category and resource"""
+        records = {}
+        for category, items in report.get('findings', {}).items():
+            if category not in STATE_CATEGORIES:
+                continue
+            for item in items:
+                resource_id = finding_key(category, item)
+                records[f"{category}:{resource_id}"] = {
+                    'category': category,
+                    'resource_type': item.get('resource_type') or CATEGORY_RESOURCE_TYPES[category],
+                    'resource_id': item[STATE_CATEGORIES[category]],
+                    'region': item.get('region', report.get('region')),
+                    'tags': item.get('tags') or item.get('existing_tags') or {},
+                    'estimated_monthly_savings': item.get('estimated_monthly_savings', 0.0),
+                    'finding': item
+                }
+        return records
+
+    def load(self, report):
+        """Reconcile the index with a report, touching only changed records"""
+        records = self.build_records(report)
+        removed = [key for key in self.records if key not in records]
+        changed = [key for key, record in records.items() if self.records.get(key) != record]
+
+        for key in removed + changed:
+            if key in self.records:
+                self._remove(key)
+        for key in changed:
+            self._add(key, records[key])
+
+        return {'added_or_changed': len(changed), 'removed': len(removed), 'total': len(self.records)}
+
+    def _add(self, key, record):
+        self.records[key] = record
+        for tag_key, tag_value in record['tags'].items():
+            self.by_tag.setdefault((tag_key, tag_value), set()).add(key)
+            self.by_tag_key.setdefault(tag_key, set()).add(key)
+        self.by_region.setdefault(record['region'], set()).add(key)
+        self.by_type.setdefault(record['resource_type'], set()).add(key)
+        self.by_category.setdefault(record['category'], set()).add(key)
+        bisect.insort(self.by_savings, (record['estimated_monthly_savings'], key))
+
+    def _remove(self, key):
+        record = self.records.pop(key)
+        for tag_key, tag_value in record['tags'].items():
+            self._discard(self.by_tag, (tag_key, tag_value), key)
+            self._discard(self.by_tag_key, tag_key, key)
+        self._discard(self.by_region, record['region'], key)
+        self._discard(self.by_type, record['resource_type'], key)
+        self._discard(self.by_category, record['category'], key)
+        position = bisect.bisect_left(self.by_savings, (record['estimated_monthly_savings'], key))
+        del self.by_savings[position]
+
+    @staticmethod
+    def _discard(index, value, key):
+        keys = index.get(value)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del index[value]
+
+    def query(self, tags=None, region=None, resource_type=None, category=None,
+              min_savings=None, max_savings=None, where=None, sort=None, limit=None):
+        """Filter through the indexes, apply where-clauses, then sort and take the top K"""
+        candidates = []
+        for tag in tags or []:
+            tag_key, has_value, tag_value = tag.partition('=')
+            candidates.append(
+                self.by_tag.get((tag_key, tag_value), set()) if has_value else self.by_tag_key.get(tag_key, set())
+            )
+        if region:
+            candidates.append(self.by_region.get(region, set()))
+        if resource_type:
+            candidates.append(self.by_type.get(resource_type, set()))
+        if category:
+            candidates.append(self.by_category.get(category, set()))
+        if min_savings is not None or max_savings is not None:
+            savings = lambda entry: entry[0]
+            low = bisect.bisect_left(
+                self.by_savings, min_savings if min_savings is not None else float('-inf'), key=savings
+            )
+            high = bisect.bisect_right(
+                self.by_savings, max_savings if max_savings is not None else float('inf'), key=savings
+            )
+            candidates.append({key for _, key in self.by_savings[low:high]})
+
+        # Intersect from the most selective index outwards
+        if candidates:
+            candidates.sort(key=len)
+            keys = set(candidates[0])
+            for other in candidates[1:]:
+                keys &= other
+        else:
+            keys = self.records.keys()
+
+        clauses = [parse_where(clause) for clause in where or []]
+        matches = [
+            self.records[key] for key in keys
+            if all(self._matches(self.records[key], clause) for clause in clauses)
+        ]
+
+        sort = sort or '-estimated_monthly_savings'
+        field = sort.lstrip('-')
+        sort_key = lambda record: self._sort_value(self._field(record, field))
+        if limit is not None:
+            pick = heapq.nlargest if sort.startswith('-') else heapq.nsmallest
+            ordered = pick(limit, matches, key=sort_key)
+        else:
+            ordered = sorted(matches, key=sort_key, reverse=sort.startswith('-'))
+
+        return {
+            'count': len(matches),
+            'total_estimated_monthly_savings': round(sum(r['estimated_monthly_savings'] for r in matches), 2),
+            'results': [self._flatten(record) for record in ordered]
+        }
+
+    @staticmethod
+    def _field(record, field):
+        if field in record and field != 'finding':
+            return record[field]
+        return record['finding'].get(field)
+
+    def _matches(self, record, clause):
+        field, operator, value = clause
+        actual = self._field(record, field)
+        if actual is None:
+            return False
+        try:
+            return WHERE_OPERATORS[operator](actual, value if isinstance(actual, (int, float)) else str(value))
+        except TypeError:
+            return False
+
+    @staticmethod
+    def _sort_value(value):
+        """Rank missing values below strings and strings below numbers so mixed fields still sort"""
+        if value is None:
+            return (0, 0, '')
+        if isinstance(value, (int, float)):
+            return (2, value, '')
+        return (1, 0, str(value))
+
+    @staticmethod
+    def _flatten(record):
+        result = dict(record['finding'])
+        for field in ('category', 'resource_type', 'resource_id', 'region', 'tags', 'estimated_monthly_savings'):
+            result[field] = record[field]
+        return result
+
+
+class QueryService:
+    """Keeps a FindingsIndex in step with the latest report in the ReportStore"""
+
+    def __init__(self, report_store, reload_interval=60):
+        self.report_store = report_store
+        self.reload_interval = reload_interval
+        self.index = FindingsIndex()
+        self.report_key = None
+        self.checked_at = 0
+        self.lock = threading.Lock()
+
+    def refresh(self, force=False):
+        """Reload when the manifest points at a new report; cheap when nothing changed"""
+        with self.lock:
+            if not force and time.monotonic() - self.checked_at < self.reload_interval:
+                return None
+            self.checked_at = time.monotonic()
+
+            latest = self.report_store.get_latest()
+            if not latest or latest['report_key'] == self.report_key:
+                return None
+
+            report = self.report_store.get_report(latest['report_key'])
+            if report is None:
+                logger.warning(f"Manifest points at missing report {latest['report_key']}")
+                return None
+
+            stats = self.index.load(report)
+            self.report_key = latest['report_key']
+            logger.info(f"Loaded {self.report_key}: {stats}")
+            return stats
+
+    def query(self, **filters):
+        self.refresh()
+        with self.lock:
+            result = self.index.query(**filters)
+        result['report_key'] = self.report_key
+        return result
+
+
+def query_from_params(params):
+    """Translate parsed query-string or CLI parameters into FindingsIndex.query arguments"""
+    first = lambda name: (params.get(name) or [None])[0]
+    min_savings, max_savings, limit = first('min_savings'), first('max_savings'), first('limit')
+    return {
+        'tags': params.get('tag'),
+        'region': first('region'),
+        'resource_type': first('type'),
+        'category': first('category'),
+        'min_savings': float(min_savings) if min_savings is not None else None,
+        'max_savings': float(max_savings) if max_savings is not None else None,
+        'where': params.get('where'),
+        'sort': first('sort'),
+        'limit': int(limit) if limit is not None else None
+    }
+
+
+def make_handler(service):
+    class QueryHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            try:
+                if url.path == '/query':
+                    status, body = 200, service.query(**query_from_params(parse_qs(url.query)))
+                elif url.path == '/reload':
+                    status, body = 200, {'reloaded': service.refresh(force=True), 'report_key': service.report_key}
+                else:
+                    status, body = 404, {'error': f"Unknown path {url.path}"}
+            except ValueError as e:
+                status, body = 400, {'error': str(e)}
+
+            payload = json.dumps(body, default=str).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            logger.info(format % args)
+
+    return QueryHandler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Query the latest cost optimization report')
+    parser.add_argument('--bucket', default=os.environ.get('REPORT_BUCKET', 'aws-cost-optimizer-reports'))
+    parser.add_argument('--prefix', default='reports')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    query_parser = subparsers.add_parser('query', help='Run one query and print JSON results')
+    query_parser.add_argument('--tag', action='append', help='Key=Value, or Key to match any value')
+    query_parser.add_argument('--region')
+    query_parser.add_argument('--type', help='EC2, RDS, EBS or Snapshot')
+    query_parser.add_argument('--category', choices=sorted(STATE_CATEGORIES))
+    query_parser.add_argument('--min-savings', dest='min_savings')
+    query_parser.add_argument('--max-savings', dest='max_savings')
+    query_parser.add_argument('--where', action='append', help="Finding field filter, e.g. 'size_gb>=500'")
+    query_parser.add_argument('--sort', help='Field to sort by; prefix with - for descending')
+    query_parser.add_argument('--limit')
+
+    serve_parser = subparsers.add_parser('serve', help='Serve GET /query and /reload over HTTP')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8080)
+    serve_parser.add_argument('--reload-interval', type=int, default=60)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO'))
+
+    service = QueryService(
+        ReportStore(args.bucket, prefix=args.prefix),
+        reload_interval=getattr(args, 'reload_interval', 60)
+    )
+    service.refresh(force=True)
+
+    if args.command == 'query':
+        params = {
+            name: value if isinstance(value, list) else [value]
+            for name, value in vars(args).items()
+            if value is not None
+        }
+        print(json.dumps(service.query(**query_from_params(params)), indent=2, default=str))
+        return
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    logger.info(f"Serving report queries on http://{args.host}:{args.port}/query")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
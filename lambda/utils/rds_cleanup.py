@@ -4,11 +4,16 @@ import logging
 
 logger = logging.getLogger()
 
+# Average daily connections below which an instance is considered idle
+IDLE_CONNECTION_THRESHOLD = 1
+
 
 class RDSCleanup:
-    def __init__(self, region='us-east-1'):
-        self.rds_client = boto3.client('rds', region_name=region)
-        self.cloudwatch = boto3.client('cloudwatch', region_name=region)
+    def __init__(self, region='us-east-1', client_factory=None, metric_cache=None):
+        client_factory = client_factory or boto3.client
+        self.rds_client = client_factory('rds', region_name=region)
+        self.cloudwatch = client_factory('cloudwatch', region_name=region)
+        self.metric_cache = metric_cache
 
     def get_idle_instances(self, idle_days=7):
         """Detect RDS instances with low connections for specified days"""
@@ -18,29 +23,9 @@ class RDSCleanup:
             response = self.rds_client.describe_db_instances()
 
             for db_instance in response['DBInstances']:
-                db_id = db_instance['DBInstanceIdentifier']
-                db_status = db_instance['DBInstanceStatus']
-
-                if db_status == 'available':
-                    # Check CloudWatch metrics for database connections
-                    avg_connections = self.get_average_connections(db_id, idle_days)
-                    
-                    if avg_connections < 1:  # Less than 1 average connection
-                        estimated_savings = self.estimate_rds_savings(db_instance)
-                        
-                        tags_response = self.rds_client.list_tags_for_resource(
-                            ResourceName=db_instance['DBInstanceArn']
-                        )
-                        
-                        idle_instances.append({
-                            'db_instance_id': db_id,
-                            'db_instance_class': db_instance['DBInstanceClass'],
-                            'engine': db_instance['Engine'],
-                            'status': db_status,
-                            'avg_connections': avg_connections,
-                            'estimated_monthly_savings': estimated_savings,
-                            'tags': {tag['Key']: tag['Value'] for tag in tags_response.get('TagList', [])}
-                        })
+                finding = self.evaluate_instance(db_instance, idle_days)
+                if finding:
+                    idle_instances.append(finding)
 
             logger.info(f"Found {len(idle_instances)} idle RDS instances")
             return idle_instances
@@ -49,31 +34,93 @@ class RDSCleanup:
             logger.error(f"Error detecting idle RDS instances: {e}")
             return []
 
+    def describe_instance(self, db_id):
+        """Fetch a single RDS instance, or None if it no longer exists"""
+        try:
+            response = self.rds_client.describe_db_instances(DBInstanceIdentifier=db_id)
+            if response['DBInstances']:
+                return response['DBInstances'][0]
+        except Exception as e:
+            if 'NotFound' not in str(e):
+                raise
+            logger.info(f"RDS instance {db_id} no longer exists")
+        return None
+
+    def evaluate_instance(self, db_instance, idle_days=7):
+        """Return an idle finding for an available instance with low connections, else None"""
+        db_id = db_instance['DBInstanceIdentifier']
+        db_status = db_instance['DBInstanceStatus']
+
+        if db_status != 'available':
+            return None
+
+        # Check CloudWatch metrics for database connections
+        avg_connections = self.get_average_connections(db_id, idle_days)
+        
+        if avg_connections >= IDLE_CONNECTION_THRESHOLD:
+            return None
+
+        tags_response = self.rds_client.list_tags_for_resource(
+            ResourceName=db_instance['DBInstanceArn']
+        )
+        
+        return self.build_idle_finding(db_instance, avg_connections, tags_response.get('TagList', []))
+
+    def build_idle_finding(self, db_instance, avg_connections, tag_list):
+        """Build the idle finding for an RDS instance"""
+        return {
+            'db_instance_id': db_instance['DBInstanceIdentifier'],
+            'db_instance_class': db_instance['DBInstanceClass'],
+            'engine': db_instance['Engine'],
+            'status': db_instance['DBInstanceStatus'],
+            'avg_connections': avg_connections,
+            'estimated_monthly_savings': self.estimate_rds_savings(db_instance),
+            'tags': {tag['Key']: tag['Value'] for tag in tag_list}
+        }
+
     def get_average_connections(self, db_id, days=7):
         """Get average database connections over specified period"""
         try:
-            end_time = datetime.now()
-            start_time = end_time - timedelta(days=days)
-
-            response = self.cloudwatch.get_metric_statistics(
-                Namespace='AWS/RDS',
-                MetricName='DatabaseConnections',
-                Dimensions=[{'Name': 'DBInstanceIdentifier', 'Value': db_id}],
-                StartTime=start_time,
-                EndTime=end_time,
-                Period=86400,  # 1 day
-                Statistics=['Average']
-            )
+            query = self.connection_metric_query(db_id, days)
+            response = self.cloudwatch.get_metric_statistics(**query)
 
-            if response['Datapoints']:
-                avg = sum(dp['Average'] for dp in response['Datapoints']) / len(response['Datapoints'])
-                return round(avg, 2)
-            return 0.0
+            return self.average_connections_from(query, response['Datapoints'], days)
 
         except Exception as e:
             logger.warning(f"Could not get CloudWatch metrics for {db_id}: {e}")
             return 0.0
 
+    def connection_metric_query(self, db_id, days=7):
+        """Build the GetMetricStatistics parameters for average daily connections"""
+        dimensions = [{'Name': 'DBInstanceIdentifier', 'Value': db_id}]
+        if self.metric_cache:
+            # Only the days missing from the cache need to be fetched
+            return self.metric_cache.missing_query('AWS/RDS', 'DatabaseConnections', dimensions, days)
+
+        end_time = datetime.now()
+        return {
+            'Namespace': 'AWS/RDS',
+            'MetricName': 'DatabaseConnections',
+            'Dimensions': dimensions,
+            'StartTime': end_time - timedelta(days=days),
+            'EndTime': end_time,
+            'Period': 86400,  # 1 day
+            'Statistics': ['Average']
+        }
+
+    def average_connections_from(self, query, datapoints, days=7):
+        """Average connections for a fetched query, merging with cached days when caching"""
+        if self.metric_cache:
+            datapoints = self.metric_cache.update(query, datapoints, days)
+        return self.average_datapoints(datapoints)
+
+    def average_datapoints(self, datapoints):
+        """Average CloudWatch datapoints, treating no data as zero connections"""
+        if datapoints:
+            avg = sum(dp['Average'] for dp in datapoints) / len(datapoints)
+            return round(avg, 2)
+        return 0.0
+
     def estimate_rds_savings(self, db_instance):
         """Estimate monthly cost savings for RDS instance"""
         instance_class = db_instance['DBInstanceClass']
@@ -0,0 +1,111 @@
+import boto3
+import json
+import logging
+from datetime import datetime
+
+logger = logging.getLogger()
+
+
+# Summary fields copied into manifest entries for each run
+SUMMARY_FIELDS = (
+    'total_estimated_monthly_savings',
+    'idle_ec2_count',
+    'idle_rds_count',
+    'unattached_volumes_count',
+    'zero_io_volumes_count',
+    'old_snapshots_count',
+    'non_compliant_resources_count'
+)
+
+
+class ReportStore:
+    """Writes reports under date-partitioned keys and maintains a small manifest.
+
+    Layout under the prefix:
+      year=YYYY/month=MM/day=DD/cost-optimization-HH-MM-SS.json  full reports
+      manifest/latest.json                                      pointer to the newest run
+      manifest/daily/YYYY-MM-DD.json                            every run of that day
+      manifest/monthly/YYYY-MM.json                             per-day totals of that month
+    """
+
+    def __init__(self, bucket, prefix='reports', client_factory=None):
+        self.bucket = bucket
+        self.prefix = prefix.rstrip('/')
+        self.s3_client = (client_factory or boto3.client)('s3')
+
+    def report_key(self, run_time):
+        """Date-partitioned key for a report written at run_time"""
+        return (
+            f"{self.prefix}/year={run_time:%Y}/month={run_time:%m}/day={run_time:%d}/"
+            f"cost-optimization-{run_time:%H-%M-%S}.json"
+        )
+
+    def save(self, report, run_time=None):
+        """Write the report and update the manifest; returns the report key"""
+        run_time = run_time or datetime.now()
+        key = self.report_key(run_time)
+
+        self._put_json(key, report, indent=2)
+        logger.info(f"Report saved to s3://{self.bucket}/{key}")
+
+        try:
+            self._update_manifest(report, key, run_time)
+        except Exception as e:
+            logger.error(f"Error updating report manifest: {e}")
+
+        return key
+
+    def _update_manifest(self, report, key, run_time):
+        summary = report.get('summary', {})
+        entry = {
+            'report_key': key,
+            'scan_date': report.get('scan_date', run_time.isoformat()),
+            'region': report.get('region'),
+            'summary': {field: summary[field] for field in SUMMARY_FIELDS if field in summary}
+        }
+
+        # Per-day index of every run
+        day = f"{run_time:%Y-%m-%d}"
+        daily_key = f"{self.prefix}/manifest/daily/{day}.json"
+        daily = self._get_json(daily_key) or {'date': day, 'runs': []}
+        daily['runs'].append(entry)
+        self._put_json(daily_key, daily)
+
+        # Per-month index with each day's latest totals and run count
+        month = f"{run_time:%Y-%m}"
+        monthly_key = f"{self.prefix}/manifest/monthly/{month}.json"
+        monthly = self._get_json(monthly_key) or {'month': month, 'days': {}}
+        monthly['days'][day] = {
+            'index_key': daily_key,
+            'run_count': len(daily['runs']),
+            'latest': entry
+        }
+        self._put_json(monthly_key, monthly)
+
+        self._put_json(f"{self.prefix}/manifest/latest.json", dict(entry, daily_index_key=daily_key))
+        logger.info(f"Updated report manifest for {day}")
+
+    def get_latest(self):
+        """Return the latest-run pointer, or None if no report has been saved"""
+        return self._get_json(f"{self.prefix}/manifest/latest.json")
+
+    def get_report(self, key):
+        """Return the report stored at key, or None if it does not exist"""
+        return self._get_json(key)
+
+    def _get_json(self, key):
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=key)
+            return json.loads(response['Body'].read())
+        except Exception as e:
+            if 'NoSuchKey' not in str(e):
+                raise
+            return None
+
+    def _put_json(self, key, body, indent=None):
+        self.s3_client.put_object(
+            Bucket=self.bucket,
+            Key=key,
+            Body=json.dumps(body, indent=indent),
+            ContentType='application/json'
+        )
@@ -0,0 +1,90 @@
+import heapq
+import logging
+
+logger = logging.getLogger()
+
+
+# Finding categories that carry estimated savings, mapped to their ID field
+SAVINGS_CATEGORIES = {
+    'idle_ec2_instances': 'instance_id',
+    'idle_rds_instances': 'db_instance_id',
+    'unattached_ebs_volumes': 'volume_id',
+    'zero_io_ebs_volumes': 'volume_id',
+    'old_snapshots': 'snapshot_id'
+}
+
+UNTAGGED = '(untagged)'
+
+
+class SavingsRollup:
+    def __init__(self, group_tags=None, top_k=5):
+        self.group_tags = group_tags or ['Owner', 'Project', 'Environment']
+        self.top_k = top_k
+
+    def build(self, findings, region):
+        """Aggregate savings by tag and region in a single pass over all findings"""
+        dimensions = list(self.group_tags) + ['Region']
+        groups = {dimension: {} for dimension in dimensions}
+
+        try:
+            for category, id_field in SAVINGS_CATEGORIES.items():
+                for item in findings.get(category, []):
+                    savings = item.get('estimated_monthly_savings', 0.0)
+                    tags = item.get('tags') or {}
+                    entry = (savings, item.get(id_field, 'N/A'), category)
+
+                    for dimension in dimensions:
+                        if dimension == 'Region':
+                            key = item.get('region', region)
+                        else:
+                            key = tags.get(dimension) or UNTAGGED
+                        self._add(groups[dimension], key, entry)
+
+            rollup = {
+                dimension: self._finalize(buckets)
+                for dimension, buckets in groups.items()
+            }
+            logger.info(f"Built savings roll-up across {len(dimensions)} dimensions")
+            return rollup
+
+        except Exception as e:
+            logger.error(f"Error building savings roll-up: {e}")
+            return {}
+
+    def _add(self, buckets, key, entry):
+        """Fold one finding into its group, keeping a bounded min-heap of top resources"""
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = {'savings': 0.0, 'count': 0, 'top': []}
+
+        bucket['savings'] += entry[0]
+        bucket['count'] += 1
+
+        # top_k <= 0 keeps group totals only
+        if self.top_k <= 0:
+            return
+        if len(bucket['top']) < self.top_k:
+            heapq.heappush(bucket['top'], entry)
+        elif entry[0] > bucket['top'][0][0]:
+            heapq.heapreplace(bucket['top'], entry)
+
+    def _finalize(self, buckets):
+        """Convert group buckets into report rows sorted by savings"""
+        rows = []
+        for key, bucket in buckets.items():
+            rows.append({
+                'group': key,
+                'estimated_monthly_savings': round(bucket['savings'], 2),
+                'resource_count': bucket['count'],
+                'top_resources': [
+                    {
+                        'resource_id': resource_id,
+                        'category': category,
+                        'estimated_monthly_savings': savings
+                    }
+                    for savings, resource_id, category in sorted(bucket['top'], reverse=True)
+                ]
+            })
+
+        rows.sort(key=lambda row: row['estimated_monthly_savings'], reverse=True)
+        return rows
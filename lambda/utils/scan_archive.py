@@ -0,0 +1,358 @@
+import boto3
+import gzip
+import json
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger()
+
+
+# Request parameters that change on every run and are ignored when matching replayed calls
+VOLATILE_PARAMS = {'StartTime', 'EndTime'}
+
+# CloudWatch metrics are archived per series as daily statistics over this many days,
+# so replays can re-aggregate any window up to it instead of matching the recorded call
+METRIC_RECORD_DAYS = 90
+METRIC_STATISTICS = ('Sum', 'SampleCount', 'Minimum', 'Maximum')
+METRIC_DATA_MAX_QUERIES = 500
+DAY = timedelta(days=1)
+
+# CloudWatch may round the start of daily buckets down to the hour
+BUCKET_TOLERANCE = timedelta(hours=1)
+
+
+def _encode(value):
+    """JSON encoder hook for datetimes and bytes in AWS responses"""
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, bytes):
+        return {'__bytes__': value.decode('utf-8', errors='replace')}
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _decode(obj):
+    """JSON object hook restoring datetimes written by _encode"""
+    if '__datetime__' in obj:
+        return datetime.fromisoformat(obj['__datetime__'])
+    if '__bytes__' in obj:
+        return obj['__bytes__'].encode('utf-8')
+    return obj
+
+
+def _series_key(metric):
+    """Stable key for one CloudWatch metric series (namespace, name and dimensions)"""
+    dimensions = sorted((d['Name'], d['Value']) for d in metric.get('Dimensions', []))
+    return json.dumps([metric['Namespace'], metric['MetricName'], dimensions])
+
+
+def _aggregate(points, stat):
+    """Combine daily statistics into one value for the requested statistic"""
+    if stat == 'Average':
+        samples = sum(point.get('SampleCount', 0) for point in points)
+        return sum(point.get('Sum', 0) for point in points) / samples if samples else None
+    if stat in ('Sum', 'SampleCount'):
+        return sum(point.get(stat, 0) for point in points)
+    if stat in ('Minimum', 'Maximum'):
+        values = [point[stat] for point in points if stat in point]
+        if not values:
+            return None
+        return min(values) if stat == 'Minimum' else max(values)
+    raise ValueError(f"Cannot re-aggregate archived metrics to statistic {stat}")
+
+
+def _call_key(service, operation, params):
+    """Build a stable lookup key for an API call, ignoring volatile time parameters"""
+    stable = {k: v for k, v in params.items() if k not in VOLATILE_PARAMS}
+    return f"{service}:{operation}:{json.dumps(stable, sort_keys=True, default=str)}"
+
+
+class ScanArchive:
+    """Raw API responses captured from one scan, keyed by service, operation and parameters"""
+
+    def __init__(self, calls=None, metadata=None, metrics=None):
+        self.calls = calls or {}
+        self.metadata = metadata or {}
+        self.metrics = metrics or {}
+
+    def record(self, service, operation, params, response=None, error=None):
+        """Store the outcome of a single API call"""
+        entry = {'error': error} if error is not None else {'response': response}
+        self.calls[_call_key(service, operation, params)] = entry
+
+    def lookup(self, service, operation, params):
+        """Return the recorded outcome of an API call, raising if it was never recorded"""
+        key = _call_key(service, operation, params)
+        if key not in self.calls:
+            raise KeyError(f"No recorded response for {service}.{operation} {params}")
+        return self.calls[key]
+
+    def record_metrics(self, client, metrics):
+        """Fetch daily statistics over the archive window for series not yet recorded"""
+        window = self.metadata.get('metric_window')
+        if window is None:
+            end = datetime.now(timezone.utc)
+            window = self.metadata['metric_window'] = {
+                'start': (end - timedelta(days=METRIC_RECORD_DAYS)).isoformat(),
+                'end': end.isoformat()
+            }
+
+        pending = {_series_key(metric): metric for metric in metrics if _series_key(metric) not in self.metrics}
+        queries = []
+        for key, metric in pending.items():
+            self.metrics[key] = {}
+            for stat in METRIC_STATISTICS:
+                queries.append({
+                    'Id': f"m{len(queries)}",
+                    'MetricStat': {'Metric': metric, 'Period': 86400, 'Stat': stat},
+                    '_target': (key, stat)
+                })
+
+        paginator = client.get_paginator('get_metric_data')
+        for start in range(0, len(queries), METRIC_DATA_MAX_QUERIES):
+            batch = queries[start:start + METRIC_DATA_MAX_QUERIES]
+            targets = {query['Id']: query.pop('_target') for query in batch}
+            for page in paginator.paginate(
+                MetricDataQueries=batch,
+                StartTime=datetime.fromisoformat(window['start']),
+                EndTime=datetime.fromisoformat(window['end'])
+            ):
+                for result in page['MetricDataResults']:
+                    key, stat = targets[result['Id']]
+                    for timestamp, value in zip(result['Timestamps'], result['Values']):
+                        self.metrics[key].setdefault(timestamp.isoformat(), {})[stat] = value
+
+    def metric_values(self, metric, start_time, end_time, period, stat):
+        """Re-aggregate archived daily statistics to a window of the same length ending at recording time"""
+        window = self.metadata.get('metric_window')
+        if window is None:
+            raise KeyError("Archive has no recorded CloudWatch metrics")
+        key = _series_key(metric)
+        if key not in self.metrics:
+            raise KeyError(f"No recorded metric series {key}")
+
+        days = max(1, math.ceil((end_time - start_time) / DAY - 1e-6))
+        self.check_metric_window(days)
+        if period < 86400:
+            raise ValueError(f"Archived metrics are daily; cannot serve a {period}s period")
+        group_days = max(1, round(period / 86400))
+
+        # Replays are anchored to the recording: the window ends where the recording did
+        window_start = datetime.fromisoformat(window['end']) - days * DAY - BUCKET_TOLERANCE
+        groups = {}
+        for timestamp, point in sorted(self.metrics[key].items()):
+            offset = datetime.fromisoformat(timestamp) - window_start
+            if offset >= timedelta(0):
+                groups.setdefault(offset // (group_days * DAY), []).append(point)
+
+        return [
+            (window_start + BUCKET_TOLERANCE + index * group_days * DAY, _aggregate(points, stat))
+            for index, points in sorted(groups.items())
+        ]
+
+    def check_metric_window(self, days):
+        """Raise if a scan asks for a longer metric window than the archive holds or will record"""
+        window = self.metadata.get('metric_window')
+        if window is None:
+            recorded = timedelta(days=METRIC_RECORD_DAYS)
+        else:
+            recorded = datetime.fromisoformat(window['end']) - datetime.fromisoformat(window['start'])
+        if days * DAY > recorded:
+            raise ValueError(f"Archive holds {recorded.days} days of metrics; cannot replay a {days}-day window")
+
+    def metric_statistics(self, params):
+        """Answer a GetMetricStatistics call from the archived daily series"""
+        metric = {
+            'Namespace': params['Namespace'],
+            'MetricName': params['MetricName'],
+            'Dimensions': params.get('Dimensions', [])
+        }
+        values = {
+            stat: self.metric_values(metric, params['StartTime'], params['EndTime'], params['Period'], stat)
+            for stat in params['Statistics']
+        }
+
+        datapoints = {}
+        for stat, series in values.items():
+            for timestamp, value in series:
+                if value is not None:
+                    datapoints.setdefault(timestamp, {'Timestamp': timestamp})[stat] = value
+        return {'Label': params['MetricName'], 'Datapoints': list(datapoints.values())}
+
+    def metric_data(self, params):
+        """Answer a GetMetricData call (all pages at once) from the archived daily series"""
+        results = []
+        for query in params['MetricDataQueries']:
+            stat = query['MetricStat']
+            series = [
+                (timestamp, value)
+                for timestamp, value in self.metric_values(
+                    stat['Metric'], params['StartTime'], params['EndTime'], stat['Period'], stat['Stat']
+                )
+                if value is not None
+            ]
+            results.append({
+                'Id': query['Id'],
+                'Label': stat['Metric']['MetricName'],
+                'Timestamps': [timestamp for timestamp, _ in reversed(series)],
+                'Values': [value for _, value in reversed(series)],
+                'StatusCode': 'Complete'
+            })
+        return {'MetricDataResults': results}
+
+    def client_factory(self, mode):
+        """Return a boto3.client-compatible factory for 'record' or 'replay' mode"""
+        def factory(service_name, region_name=None, **kwargs):
+            if mode == 'record':
+                client = boto3.client(service_name, region_name=region_name, **kwargs)
+                return RecordingClient(client, self, service_name)
+            return ReplayClient(self, service_name)
+        return factory
+
+    def save(self, location):
+        """Write the archive as gzip-compressed JSON to a local path or s3://bucket/key"""
+        body = gzip.compress(
+            json.dumps(
+                {'metadata': self.metadata, 'calls': self.calls, 'metrics': self.metrics}, default=_encode
+            ).encode('utf-8')
+        )
+
+        if location.startswith('s3://'):
+            bucket, key = location[5:].split('/', 1)
+            boto3.client('s3').put_object(Bucket=bucket, Key=key, Body=body, ContentType='application/gzip')
+        else:
+            with open(location, 'wb') as f:
+                f.write(body)
+
+        logger.info(f"Saved scan archive with {len(self.calls)} calls to {location}")
+
+    @classmethod
+    def load(cls, location):
+        """Read an archive written by save() from a local path or s3://bucket/key"""
+        if location.startswith('s3://'):
+            bucket, key = location[5:].split('/', 1)
+            body = boto3.client('s3').get_object(Bucket=bucket, Key=key)['Body'].read()
+        else:
+            with open(location, 'rb') as f:
+                body = f.read()
+
+        data = json.loads(gzip.decompress(body).decode('utf-8'), object_hook=_decode)
+        logger.info(f"Loaded scan archive with {len(data['calls'])} calls from {location}")
+        return cls(calls=data['calls'], metadata=data.get('metadata'), metrics=data.get('metrics'))
+
+
+class RecordingClient:
+    """Proxy around a boto3 client that records every response into a ScanArchive"""
+
+    def __init__(self, client, archive, service):
+        self._client = client
+        self._archive = archive
+        self._service = service
+
+    def __getattr__(self, name):
+        if name == 'get_metric_statistics':
+            return self._get_metric_statistics
+        if name == 'get_metric_data':
+            return self._get_metric_data
+        attr = getattr(self._client, name)
+        if name == 'get_paginator':
+            return lambda operation: RecordingPaginator(
+                self._client, attr(operation), self._archive, self._service, operation
+            )
+        if not callable(attr) or name.startswith('_'):
+            return attr
+
+        def call(**kwargs):
+            try:
+                response = attr(**kwargs)
+            except Exception as e:
+                self._archive.record(self._service, name, kwargs, error=str(e))
+                raise
+            response.pop('ResponseMetadata', None)
+            self._archive.record(self._service, name, kwargs, response=response)
+            return response
+        return call
+
+    # Metric calls are archived as daily series and answered the same way replays are
+    def _get_metric_statistics(self, **kwargs):
+        metric = {
+            'Namespace': kwargs['Namespace'],
+            'MetricName': kwargs['MetricName'],
+            'Dimensions': kwargs.get('Dimensions', [])
+        }
+        self._archive.record_metrics(self._client, [metric])
+        return self._archive.metric_statistics(kwargs)
+
+    def _get_metric_data(self, **kwargs):
+        self._archive.record_metrics(
+            self._client, [query['MetricStat']['Metric'] for query in kwargs['MetricDataQueries']]
+        )
+        return self._archive.metric_data(kwargs)
+
+
+class RecordingPaginator:
+    """Paginator proxy that records all pages of a paginated call as one entry"""
+
+    def __init__(self, client, paginator, archive, service, operation):
+        self._client = client
+        self._paginator = paginator
+        self._archive = archive
+        self._service = service
+        self._operation = operation
+
+    def paginate(self, **kwargs):
+        if self._operation == 'get_metric_data':
+            self._archive.record_metrics(
+                self._client, [query['MetricStat']['Metric'] for query in kwargs['MetricDataQueries']]
+            )
+            yield self._archive.metric_data(kwargs)
+            return
+
+        pages = []
+        for page in self._paginator.paginate(**kwargs):
+            page.pop('ResponseMetadata', None)
+            pages.append(page)
+            yield page
+        self._archive.record(self._service, f"paginate:{self._operation}", kwargs, response=pages)
+
+
+class ReplayClient:
+    """Offline stand-in for a boto3 client that answers calls from a ScanArchive"""
+
+    def __init__(self, archive, service):
+        self._archive = archive
+        self._service = service
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name == 'get_paginator':
+            return lambda operation: ReplayPaginator(self._archive, self._service, operation)
+        if name == 'get_metric_statistics':
+            return lambda **kwargs: self._archive.metric_statistics(kwargs)
+        if name == 'get_metric_data':
+            return lambda **kwargs: self._archive.metric_data(kwargs)
+
+        def call(**kwargs):
+            entry = self._archive.lookup(self._service, name, kwargs)
+            if 'error' in entry:
+                raise Exception(entry['error'])
+            return entry['response']
+        return call
+
+
+class ReplayPaginator:
+    """Paginator stand-in that yields recorded pages"""
+
+    def __init__(self, archive, service, operation):
+        self._archive = archive
+        self._service = service
+        self._operation = operation
+
+    def paginate(self, **kwargs):
+        if self._operation == 'get_metric_data':
+            return iter([self._archive.metric_data(kwargs)])
+        entry = self._archive.lookup(self._service, f"paginate:{self._operation}", kwargs)
+        if 'error' in entry:
+            raise Exception(entry['error'])
+        return iter(entry['response'])
@@ -0,0 +1,183 @@
+import boto3
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger()
+
+
+# CloudTrail event history only reaches back 90 days
+CLOUDTRAIL_LOOKBACK_DAYS = 90
+
+# Events that move an instance into or out of the stopped state
+INDEXED_EVENTS = ('StopInstances', 'StartInstances')
+
+# Events can surface in LookupEvents up to ~15 minutes late; re-sweep that overlap
+DELIVERY_DELAY = timedelta(minutes=15)
+
+# Time-budgeted sweeps advance in chunks of this size so progress can be checkpointed
+SWEEP_CHUNK = timedelta(days=1)
+
+
+class StopTimeIndex:
+    """Last StopInstances/StartInstances time per instance from CloudTrail, persisted between runs.
+
+    The index covers a contiguous range [swept_from, swept_until]. Each run first
+    extends it forward to now, then backwards towards the CloudTrail lookback,
+    newest day first, until the lookback is covered or time_budget seconds run out;
+    a partial range is persisted and resumed on the next run. An instance's stop
+    time is known when its last stop is newer than its last start, and only once
+    refresh() has caught the range up to now; callers take the later of it and
+    the StateTransitionReason timestamp.
+    """
+
+    def __init__(self, location=None, region='us-east-1', client_factory=None, time_budget=None):
+        self.location = location
+        self.region = region
+        self.client_factory = client_factory or boto3.client
+        self.time_budget = time_budget
+        self.instances = None
+        self.swept_from = None
+        self.swept_until = None
+        self.current = False
+        self.touched = set()
+
+    def _load(self):
+        """Lazily load the index from a local path or s3://bucket/key"""
+        if self.instances is not None:
+            return
+        self.instances = {}
+        if not self.location:
+            return
+
+        try:
+            if self.location.startswith('s3://'):
+                bucket, key = self.location[5:].split('/', 1)
+                body = self.client_factory('s3').get_object(Bucket=bucket, Key=key)['Body'].read()
+            else:
+                with open(self.location, 'rb') as f:
+                    body = f.read()
+            data = json.loads(body)
+            self.instances = data.get('instances', {})
+            self.swept_until = data.get('swept_until')
+            self.swept_from = data.get('swept_from', self.swept_until)
+            logger.info(f"Loaded stop-time index with {len(self.instances)} instances from {self.location}")
+        except Exception as e:
+            if 'NoSuchKey' not in str(e) and not isinstance(e, FileNotFoundError):
+                logger.warning(f"Could not load stop-time index from {self.location}: {e}")
+
+    def refresh(self):
+        """Sweep CloudTrail for stop/start events outside the covered range and merge them in"""
+        self._load()
+        now = datetime.now(timezone.utc)
+        horizon = now - timedelta(days=CLOUDTRAIL_LOOKBACK_DAYS)
+        deadline = time.monotonic() + self.time_budget if self.time_budget is not None else None
+        paginator = self.client_factory('cloudtrail', region_name=self.region).get_paginator('lookup_events')
+        if not self.swept_until:
+            self.swept_from = self.swept_until = now.isoformat()
+
+        # Forward to now, oldest chunk first, so the covered range stays contiguous
+        start = max(horizon, datetime.fromisoformat(self.swept_until) - DELIVERY_DELAY)
+        for chunk_start, chunk_end in self._chunks(start, now):
+            if not self._sweep(paginator, chunk_start, chunk_end, deadline):
+                break
+            self.swept_until = chunk_end.isoformat()
+        self.current = self.swept_until == now.isoformat()
+
+        # Then backwards towards the lookback horizon, newest chunk first
+        if self.current:
+            end = datetime.fromisoformat(self.swept_from)
+            for chunk_start, chunk_end in reversed(list(self._chunks(horizon, end))):
+                if not self._sweep(paginator, chunk_start, chunk_end, deadline):
+                    break
+                self.swept_from = chunk_start.isoformat()
+
+        logger.info(f"Stop-time index covers {self.swept_from} to {self.swept_until}")
+        # Checkpoint now so a scan that later times out does not lose the sweep
+        self.save(prune=False)
+
+    def _chunks(self, start, end):
+        """Split [start, end] into sweep chunks; unbudgeted sweeps use a single call"""
+        if self.time_budget is None:
+            if start < end:
+                yield start, end
+            return
+        while start < end:
+            yield start, min(start + SWEEP_CHUNK, end)
+            start += SWEEP_CHUNK
+
+    def _sweep(self, paginator, start_time, end_time, deadline):
+        """Index both event types in one time range; False if the deadline cut it short"""
+        for event_name in INDEXED_EVENTS:
+            for page in paginator.paginate(
+                LookupAttributes=[{'AttributeKey': 'EventName', 'AttributeValue': event_name}],
+                StartTime=start_time,
+                EndTime=end_time
+            ):
+                for event in page['Events']:
+                    self._index_event(event_name, event)
+                if deadline is not None and time.monotonic() > deadline:
+                    logger.warning(f"Stop-time sweep ran out of time at {end_time:%Y-%m-%d %H:%M}; resuming next run")
+                    return False
+        return True
+
+    def _index_event(self, event_name, event):
+        """Record the event time against each instance it touched, keeping the latest"""
+        # Failed and dry-run calls are logged too, with an errorCode
+        if 'errorCode' in json.loads(event.get('CloudTrailEvent') or '{}'):
+            return
+
+        event_time = event['EventTime'].astimezone(timezone.utc).replace(tzinfo=None).isoformat()
+        for resource in event.get('Resources', []):
+            instance_id = resource.get('ResourceName', '')
+            if not instance_id.startswith('i-'):
+                continue
+            entry = self.instances.setdefault(instance_id, {})
+            if event_time > entry.get(event_name, ''):
+                entry[event_name] = event_time
+
+    def lookup(self, instance_id):
+        """Return the naive UTC time of the instance's last stop, or None if unknown"""
+        self._load()
+        self.touched.add(instance_id)
+        # Until the sweep has caught up with now, a newer stop or start may be missing
+        if not self.current:
+            return None
+        entry = self.instances.get(instance_id)
+        if not entry or 'StopInstances' not in entry:
+            return None
+        if entry['StopInstances'] < entry.get('StartInstances', ''):
+            return None
+        return datetime.fromisoformat(entry['StopInstances'])
+
+    def save(self, prune=True):
+        """Persist the index, optionally keeping only instances looked up this run"""
+        if self.instances is None or not self.location:
+            return
+
+        # A run that looked nothing up (e.g. a failed scan) must not empty the index
+        if prune and self.touched:
+            self.instances = {
+                instance_id: entry for instance_id, entry in self.instances.items()
+                if instance_id in self.touched
+            }
+
+        body = json.dumps({
+            'updated_at': datetime.now().isoformat(),
+            'swept_from': self.swept_from,
+            'swept_until': self.swept_until,
+            'instances': self.instances
+        })
+        try:
+            if self.location.startswith('s3://'):
+                bucket, key = self.location[5:].split('/', 1)
+                self.client_factory('s3').put_object(
+                    Bucket=bucket, Key=key, Body=body, ContentType='application/json'
+                )
+            else:
+                with open(self.location, 'w') as f:
+                    f.write(body)
+            logger.info(f"Saved stop-time index with {len(self.instances)} instances to {self.location}")
+        except Exception as e:
+            logger.error(f"Error saving stop-time index: {e}")
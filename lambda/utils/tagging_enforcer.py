@@ -1,14 +1,26 @@
 import boto3
 import json
 import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger()
 
+# EC2 CreateTags accepts up to 1000 resource IDs per request
+CREATE_TAGS_MAX_RESOURCES = 1000
+
+# CreateTags fails the whole request when any ID is malformed or no longer exists
+INVALID_ID_ERRORS = re.compile(r'InvalidID|\.NotFound|\.Malformed')
+
+# Parallel RDS AddTagsToResource calls during bulk remediation
+BULK_TAG_WORKERS = 10
+
 
 class TaggingEnforcer:
-    def __init__(self, region='us-east-1', required_tags=None):
-        self.ec2_client = boto3.client('ec2', region_name=region)
-        self.rds_client = boto3.client('rds', region_name=region)
+    def __init__(self, region='us-east-1', required_tags=None, client_factory=None):
+        client_factory = client_factory or boto3.client
+        self.ec2_client = client_factory('ec2', region_name=region)
+        self.rds_client = client_factory('rds', region_name=region)
         self.required_tags = required_tags or ['Owner', 'Project', 'Environment']
 
     def check_ec2_tags(self):
@@ -20,21 +32,9 @@ class TaggingEnforcer:
 
             for reservation in response['Reservations']:
                 for instance in reservation['Instances']:
-                    instance_id = instance['InstanceId']
-                    instance_state = instance['State']['Name']
-                    
-                    if instance_state != 'terminated':
-                        tags = {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
-                        missing_tags = [tag for tag in self.required_tags if tag not in tags]
-                        
-                        if missing_tags:
-                            non_compliant_resources.append({
-                                'resource_type': 'EC2',
-                                'resource_id': instance_id,
-                                'resource_name': tags.get('Name', 'N/A'),
-                                'missing_tags': missing_tags,
-                                'existing_tags': tags
-                            })
+                    finding = self.evaluate_ec2_instance(instance)
+                    if finding:
+                        non_compliant_resources.append(finding)
 
             logger.info(f"Found {len(non_compliant_resources)} non-compliant EC2 instances")
             return non_compliant_resources
@@ -51,18 +51,9 @@ class TaggingEnforcer:
             response = self.ec2_client.describe_volumes()
 
             for volume in response['Volumes']:
-                volume_id = volume['VolumeId']
-                tags = {tag['Key']: tag['Value'] for tag in volume.get('Tags', [])}
-                missing_tags = [tag for tag in self.required_tags if tag not in tags]
-                
-                if missing_tags:
-                    non_compliant_volumes.append({
-                        'resource_type': 'EBS',
-                        'resource_id': volume_id,
-                        'resource_name': tags.get('Name', 'N/A'),
-                        'missing_tags': missing_tags,
-                        'existing_tags': tags
-                    })
+                finding = self.evaluate_ebs_volume(volume)
+                if finding:
+                    non_compliant_volumes.append(finding)
 
             logger.info(f"Found {len(non_compliant_volumes)} non-compliant EBS volumes")
             return non_compliant_volumes
@@ -79,21 +70,9 @@ class TaggingEnforcer:
             response = self.rds_client.describe_db_instances()
 
             for db_instance in response['DBInstances']:
-                db_id = db_instance['DBInstanceIdentifier']
-                db_arn = db_instance['DBInstanceArn']
-                
-                tags_response = self.rds_client.list_tags_for_resource(ResourceName=db_arn)
-                tags = {tag['Key']: tag['Value'] for tag in tags_response.get('TagList', [])}
-                missing_tags = [tag for tag in self.required_tags if tag not in tags]
-                
-                if missing_tags:
-                    non_compliant_instances.append({
-                        'resource_type': 'RDS',
-                        'resource_id': db_id,
-                        'resource_name': db_id,
-                        'missing_tags': missing_tags,
-                        'existing_tags': tags
-                    })
+                finding = self.evaluate_rds_instance(db_instance)
+                if finding:
+                    non_compliant_instances.append(finding)
 
             logger.info(f"Found {len(non_compliant_instances)} non-compliant RDS instances")
             return non_compliant_instances
@@ -102,6 +81,43 @@ class TaggingEnforcer:
             logger.error(f"Error checking RDS tags: {e}")
             return []
 
+    def evaluate_ec2_instance(self, instance):
+        """Return a non-compliance finding for an EC2 instance missing required tags, else None"""
+        if instance['State']['Name'] == 'terminated':
+            return None
+
+        tags = {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
+        return self._evaluate_tags('EC2', instance['InstanceId'], tags.get('Name', 'N/A'), tags)
+
+    def evaluate_ebs_volume(self, volume):
+        """Return a non-compliance finding for an EBS volume missing required tags, else None"""
+        tags = {tag['Key']: tag['Value'] for tag in volume.get('Tags', [])}
+        return self._evaluate_tags('EBS', volume['VolumeId'], tags.get('Name', 'N/A'), tags)
+
+    def evaluate_rds_instance(self, db_instance, tag_list=None):
+        """Return a non-compliance finding for an RDS instance missing required tags, else None"""
+        db_id = db_instance['DBInstanceIdentifier']
+        if tag_list is None:
+            tags_response = self.rds_client.list_tags_for_resource(ResourceName=db_instance['DBInstanceArn'])
+            tag_list = tags_response.get('TagList', [])
+        tags = {tag['Key']: tag['Value'] for tag in tag_list}
+        return self._evaluate_tags('RDS', db_id, db_id, tags)
+
+    def _evaluate_tags(self, resource_type, resource_id, resource_name, tags):
+        """Build a non-compliance finding if any required tag is missing"""
+        missing_tags = [tag for tag in self.required_tags if tag not in tags]
+        
+        if not missing_tags:
+            return None
+
+        return {
+            'resource_type': resource_type,
+            'resource_id': resource_id,
+            'resource_name': resource_name,
+            'missing_tags': missing_tags,
+            'existing_tags': tags
+        }
+
     def get_all_non_compliant_resources(self):
         """Get all non-compliant resources across services"""
         all_non_compliant = []
@@ -142,3 +158,131 @@ class TaggingEnforcer:
             logger.error(f"Error applying tags to {resource_type} {resource_id}: {e}")
             return False
 
+    def plan_bulk_tagging(self, non_compliant_resources, default_tags):
+        """Group non-compliant resources by the exact set of missing default tags to apply"""
+        groups = {}
+
+        for resource in non_compliant_resources:
+            tags_to_apply = tuple(sorted(
+                (key, default_tags[key]) for key in resource['missing_tags'] if key in default_tags
+            ))
+            if not tags_to_apply:
+                continue
+
+            # EC2 instances and EBS volumes share one CreateTags call
+            service = 'rds' if resource['resource_type'] == 'RDS' else 'ec2'
+            groups.setdefault((service, tags_to_apply), []).append(resource['resource_id'])
+
+        plan = []
+        for (service, tags_to_apply), resource_ids in groups.items():
+            batch_size = CREATE_TAGS_MAX_RESOURCES if service == 'ec2' else 1
+            plan.append({
+                'service': service,
+                'tags': dict(tags_to_apply),
+                'resource_ids': resource_ids,
+                'api_calls': -(-len(resource_ids) // batch_size)
+            })
+
+        logger.info(f"Planned bulk tagging of {sum(len(g['resource_ids']) for g in plan)} resources in {len(plan)} tag groups")
+        return plan
+
+    def get_rds_arn_index(self):
+        """Map DB instance identifiers to ARNs with one paginated describe sweep"""
+        arn_index = {}
+        paginator = self.rds_client.get_paginator('describe_db_instances')
+        for page in paginator.paginate():
+            for db_instance in page['DBInstances']:
+                arn_index[db_instance['DBInstanceIdentifier']] = db_instance['DBInstanceArn']
+        return arn_index
+
+    def _create_tags(self, batch, tags, summary):
+        """Tag one EC2/EBS batch, dropping invalid or deleted IDs and retrying the rest"""
+        while batch:
+            summary['api_calls'] += 1
+            try:
+                self.ec2_client.create_tags(Resources=batch, Tags=tags)
+                summary['resources_tagged'] += len(batch)
+                return
+            except Exception as e:
+                if not INVALID_ID_ERRORS.search(str(e)):
+                    logger.error(f"Error bulk tagging {len(batch)} EC2/EBS resources: {e}")
+                    summary['failed_resources'].extend(batch)
+                    return
+
+                # The message names the offending IDs, e.g. "The instance IDs 'i-1, i-2' do not exist"
+                named = {
+                    resource_id
+                    for quoted in re.findall(r"['\"]([^'\"]+)['\"]", str(e))
+                    for resource_id in re.split(r'[,\s]+', quoted)
+                }
+                invalid = [resource_id for resource_id in batch if resource_id in named]
+                if invalid:
+                    logger.warning(f"Skipping {len(invalid)} invalid or deleted resources: {invalid}")
+                    summary['failed_resources'].extend(invalid)
+                    batch = [resource_id for resource_id in batch if resource_id not in invalid]
+                elif len(batch) == 1:
+                    logger.warning(f"Skipping invalid or deleted resource {batch[0]}: {e}")
+                    summary['failed_resources'].extend(batch)
+                    return
+                else:
+                    # Unattributable failure: halve the batch until the bad ID is isolated
+                    middle = len(batch) // 2
+                    self._create_tags(batch[:middle], tags, summary)
+                    batch = batch[middle:]
+
+    def apply_bulk_tags(self, plan, dry_run=True, max_workers=BULK_TAG_WORKERS):
+        """Execute a bulk tagging plan, returning calls made versus resources tagged"""
+        summary = {
+            'dry_run': dry_run,
+            'planned_api_calls': sum(group['api_calls'] for group in plan)
+                                 + any(group['service'] == 'rds' for group in plan),
+            'planned_resources': sum(len(group['resource_ids']) for group in plan),
+            'api_calls': 0,
+            'resources_tagged': 0,
+            'failed_resources': []
+        }
+        if dry_run:
+            logger.info(f"Dry run: {summary['planned_resources']} resources in {summary['planned_api_calls']} calls")
+            return summary
+
+        rds_jobs = []
+        arn_index = None
+
+        for group in plan:
+            tags = [{'Key': k, 'Value': v} for k, v in group['tags'].items()]
+
+            if group['service'] == 'ec2':
+                resource_ids = group['resource_ids']
+                for start in range(0, len(resource_ids), CREATE_TAGS_MAX_RESOURCES):
+                    batch = resource_ids[start:start + CREATE_TAGS_MAX_RESOURCES]
+                    self._create_tags(batch, tags, summary)
+            else:
+                if arn_index is None:
+                    arn_index = self.get_rds_arn_index()
+                    summary['api_calls'] += 1
+                for db_id in group['resource_ids']:
+                    if db_id in arn_index:
+                        rds_jobs.append((db_id, arn_index[db_id], tags))
+                    else:
+                        summary['failed_resources'].append(db_id)
+
+        def tag_rds(job):
+            db_id, db_arn, tags = job
+            try:
+                self.rds_client.add_tags_to_resource(ResourceName=db_arn, Tags=tags)
+                return None
+            except Exception as e:
+                logger.error(f"Error applying tags to RDS {db_id}: {e}")
+                return db_id
+
+        if rds_jobs:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                failures = [db_id for db_id in executor.map(tag_rds, rds_jobs) if db_id]
+            summary['api_calls'] += len(rds_jobs)
+            summary['resources_tagged'] += len(rds_jobs) - len(failures)
+            summary['failed_resources'].extend(failures)
+
+        logger.info(
+            f"Bulk tagged {summary['resources_tagged']} resources with {summary['api_calls']} API calls"
+        )
+        return summary
@@ -8,7 +8,8 @@ logger = logging.getLogger()
 
 def send_cost_alert(webhook_url, total_savings, idle_ec2_count, idle_rds_count, 
                    unattached_volumes_count, old_snapshots_count, non_compliant_count,
-                   actions_taken, report_url):
+                   actions_taken, report_url, savings_rollup=None, zero_io_volumes_count=0,
+                   snapshot_age_days=90):
     """Send formatted cost optimization alert to Slack"""
     
     # Determine urgency emoji based on savings amount
@@ -30,6 +31,19 @@ def send_cost_alert(webhook_url, total_savings, idle_ec2_count, idle_rds_count,
     if len(actions_taken) > 5:
         actions_summary += f"\n  • ... and {len(actions_taken) - 5} more actions"
     
+    # Build top savings groups per dimension
+    rollup_fields = []
+    for dimension, rows in (savings_rollup or {}).items():
+        top_groups = "\n".join(
+            f"{row['group']}: ${row['estimated_monthly_savings']:.2f} ({row['resource_count']})"
+            for row in rows[:3]
+        )
+        if top_groups:
+            rollup_fields.append({
+                "type": "mrkdwn",
+                "text": f"*Top by {dimension}:*\n{top_groups}"
+            })
+    
     # Create Slack message
     slack_username = os.environ.get('SLACK_USERNAME', 'AWS Cost Optimizer Bot')
     message = {
@@ -84,7 +98,11 @@ def send_cost_alert(webhook_url, total_savings, idle_ec2_count, idle_rds_count,
                     },
                     {
                         "type": "mrkdwn",
-                        "text": f"📸 *Old Snapshots (>90 days):*\n{old_snapshots_count}"
+                        "text": f"💤 *Zero-I/O EBS Volumes:*\n{zero_io_volumes_count}"
+                    },
+                    {
+                        "type": "mrkdwn",
+                        "text": f"📸 *Old Snapshots (>{snapshot_age_days} days):*\n{old_snapshots_count}"
                     },
                     {
                         "type": "mrkdwn",
@@ -121,6 +139,17 @@ def send_cost_alert(webhook_url, total_savings, idle_ec2_count, idle_rds_count,
         ]
     }
     
+    if rollup_fields:
+        message["blocks"][5:5] = [
+            {
+                "type": "divider"
+            },
+            {
+                "type": "section",
+                "fields": rollup_fields[:10]
+            }
+        ]
+    
     # Send to Slack
     try:
         response = requests.post(
@@ -34,6 +34,7 @@ resource "aws_iam_policy" "lambda_policy" {
           "ec2:DescribeInstanceStatus",
           "ec2:DescribeVolumes",
           "ec2:DescribeSnapshots",
+          "ec2:DescribeAddresses",
           "ec2:DescribeTags",
           "ec2:StopInstances",
           "ec2:TerminateInstances",
@@ -80,10 +81,18 @@ resource "aws_iam_policy" "lambda_policy" {
         Effect = "Allow"
         Action = [
           "cloudwatch:GetMetricStatistics",
+          "cloudwatch:GetMetricData",
           "cloudwatch:ListMetrics"
         ]
         Resource = "*"
       },
+      {
+        Effect = "Allow"
+        Action = [
+          "cloudtrail:LookupEvents"
+        ]
+        Resource = "*"
+      },
       {
         Effect = "Allow"
         Action = [
@@ -112,3 +121,26 @@ resource "aws_iam_role_policy_attachment" "lambda_basic_execution" {
   policy_arn = "arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole"
 }
 
+
+# Read access to Cost and Usage Report exports
+resource "aws_iam_role_policy" "cur_read" {
+  count = var.cur_bucket_name != "" ? 1 : 0
+  name  = "${var.lambda_function_name}-cur-read"
+  role  = aws_iam_role.lambda_role.id
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect = "Allow"
+        Action = [
+          "s3:GetObject",
+          "s3:ListBucket"
+        ]
+        Resource = [
+          "arn:aws:s3:::${var.cur_bucket_name}",
+          "arn:aws:s3:::${var.cur_bucket_name}/*"
+        ]
+      }
+    ]
+  })
+}
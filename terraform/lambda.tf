@@ -18,18 +18,32 @@ resource "aws_lambda_function" "cost_optimizer" {
 
   environment {
     variables = {
-      SLACK_WEBHOOK_URL      = var.slack_webhook_url
-      SLACK_CHANNEL          = var.slack_channel
-      SLACK_USERNAME         = "Sumanth Nallandhigal"
-      REPORT_BUCKET          = aws_s3_bucket.cost_optimizer_reports.id
-      IDLE_EC2_DAYS          = var.idle_ec2_days
-      IDLE_RDS_DAYS          = var.idle_rds_days
-      AUTO_TERMINATE         = var.auto_terminate
-      COST_THRESHOLD         = var.cost_threshold
-      TAG_POLICY_FILE        = "config/policy.json"
-      REQUIRED_TAGS          = "Owner,Project,Environment"
-      LOG_LEVEL              = "INFO"
-      ENABLE_CLOUDWATCH_LOGS = "true"
+      SLACK_WEBHOOK_URL       = var.slack_webhook_url
+      SLACK_CHANNEL           = var.slack_channel
+      SLACK_USERNAME          = "Sumanth Nallandhigal"
+      REPORT_BUCKET           = aws_s3_bucket.cost_optimizer_reports.id
+      IDLE_EC2_DAYS           = var.idle_ec2_days
+      IDLE_RDS_DAYS           = var.idle_rds_days
+      AUTO_TERMINATE          = var.auto_terminate
+      COST_THRESHOLD          = var.cost_threshold
+      TAG_POLICY_FILE         = "config/policy.json"
+      REQUIRED_TAGS           = "Owner,Project,Environment"
+      ROLLUP_TOP_K            = "5"
+      SNAPSHOT_AGE_DAYS       = "90"
+      ZERO_IO_LOOKBACK_DAYS   = "14"
+      STOP_TIME_SWEEP_SECONDS = "60"
+      SCAN_MODE               = "live"
+      FINDINGS_STATE_KEY      = "state/current-findings.json"
+      SCAN_ENGINE             = "sync"
+      ASYNC_CONCURRENCY       = "200"
+      CUR_LOCATIONS           = var.cur_locations
+      CUR_COST_COLUMN         = "unblended"
+      TAG_REMEDIATION         = "off"
+      DEFAULT_TAGS            = ""
+      CLIENT_TTL_SECONDS      = "3600"
+      LOG_LEVEL               = "INFO"
+      ENABLE_PROFILING        = "false"
+      ENABLE_CLOUDWATCH_LOGS  = "true"
     }
   }
 
@@ -75,3 +75,50 @@ resource "aws_lambda_permission" "allow_eventbridge" {
   source_arn    = aws_cloudwatch_event_rule.daily_trigger.arn
 }
 
+
+# EventBridge rule to re-evaluate resources on state and tag changes
+resource "aws_cloudwatch_event_rule" "resource_change_trigger" {
+  count       = var.enable_event_driven_scan ? 1 : 0
+  name        = "cost-optimizer-resource-change-trigger"
+  description = "Trigger incremental cost optimizer scans on EC2/EBS/RDS state and tag changes"
+  event_pattern = jsonencode({
+    "$or" = [
+      {
+        source        = ["aws.ec2"]
+        "detail-type" = ["EC2 Instance State-change Notification", "EBS Volume Notification"]
+      },
+      {
+        source        = ["aws.rds"]
+        "detail-type" = ["RDS DB Instance Event"]
+      },
+      {
+        source        = ["aws.ec2", "aws.rds"]
+        "detail-type" = ["AWS API Call via CloudTrail"]
+        detail = {
+          eventName = ["CreateTags", "DeleteTags", "AddTagsToResource", "RemoveTagsFromResource"]
+        }
+      }
+    ]
+  })
+  tags = {
+    Name        = "Cost Optimizer Resource Change Trigger"
+    Environment = var.environment
+    ManagedBy   = "Terraform"
+  }
+}
+
+resource "aws_cloudwatch_event_target" "resource_change_lambda_target" {
+  count     = var.enable_event_driven_scan ? 1 : 0
+  rule      = aws_cloudwatch_event_rule.resource_change_trigger[0].name
+  target_id = "CostOptimizerLambdaIncremental"
+  arn       = aws_lambda_function.cost_optimizer.arn
+}
+
+resource "aws_lambda_permission" "allow_eventbridge_resource_change" {
+  count         = var.enable_event_driven_scan ? 1 : 0
+  statement_id  = "AllowExecutionFromEventBridgeResourceChange"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.cost_optimizer.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.resource_change_trigger[0].arn
+}
@@ -82,3 +82,21 @@ variable "cost_threshold" {
   default     = 50
 }
 
+
+variable "enable_event_driven_scan" {
+  description = "Re-evaluate resources incrementally on EC2/EBS/RDS state and tag change events"
+  type        = bool
+  default     = true
+}
+
+variable "cur_bucket_name" {
+  description = "S3 bucket holding Cost and Usage Report exports (empty to disable)"
+  type        = string
+  default     = ""
+}
+
+variable "cur_locations" {
+  description = "Comma-separated CUR files or s3://bucket/prefix/ locations joined against findings"
+  type        = string
+  default     = ""
+}